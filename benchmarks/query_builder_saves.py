@@ -0,0 +1,87 @@
+"""Time repeated client saves with and without QueryBuilder.
+
+Compares the f-string SQL and select-then-write of the old write_data with the
+cached statements and update-then-insert it uses now, on an in-memory Clients
+table and without commits so only per-call overhead is measured:
+
+    python benchmarks/query_builder_saves.py [saves]
+"""
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from query_builder import QueryBuilder
+
+
+CLIENT_COUNT = 1000
+
+
+def make_connection():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''CREATE TABLE clients
+                    (id INTEGER PRIMARY KEY, client_id INTEGER, client_name TEXT,
+                     client_address1 TEXT, client_address2 TEXT,
+                     client_phone TEXT, client_emailfax TEXT)''')
+    conn.execute("CREATE INDEX idx_clients_client_id ON clients (client_id)")
+    return conn
+
+
+def legacy_save(conn, table_name, key_field, data):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM {table_name} WHERE {key_field} = ?", (data[key_field],))
+    if cursor.fetchone():
+        update_fields = ", ".join([f"{k} = ?" for k in data.keys() if k != key_field])
+        values = [v for k, v in data.items() if k != key_field] + [data[key_field]]
+        cursor.execute(f"UPDATE {table_name} SET {update_fields} WHERE {key_field} = ?", values)
+    else:
+        columns = ", ".join(data.keys())
+        placeholders = ", ".join(["?" for _ in data])
+        cursor.execute(f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})", list(data.values()))
+
+
+def builder_save(conn, builder, table_name, key_field, data):
+    query, values = builder.update(table_name, key_field, data)
+    if conn.execute(query, values).rowcount == 0:
+        query, values = builder.insert(table_name, data)
+        conn.execute(query, values)
+
+
+def client_saves(count):
+    for i in range(count):
+        client_id = i % CLIENT_COUNT
+        yield {
+            'client_id': client_id,
+            'client_name': f"Client {client_id}",
+            'client_address1': f"{i} Main Street",
+            'client_address2': "",
+            'client_phone': f"555-{i:04d}",
+            'client_emailfax': f"client{client_id}@example.com",
+        }
+
+
+def time_saves(save, count):
+    saves = list(client_saves(count))
+    start = time.perf_counter()
+    for data in saves:
+        save('clients', 'client_id', data)
+    return time.perf_counter() - start
+
+
+def main(count=50000):
+    conn = make_connection()
+    legacy = time_saves(lambda *args: legacy_save(conn, *args), count)
+
+    conn = make_connection()
+    builder = QueryBuilder(conn)
+    cached = time_saves(lambda *args: builder_save(conn, builder, *args), count)
+
+    for name, seconds in (('f-string', legacy), ('QueryBuilder', cached)):
+        print(f"{name:>12}: {seconds:.3f}s total, {seconds / count * 1e6:.1f} us/save")
+    print(f"{'speedup':>12}: {legacy / cached:.2f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
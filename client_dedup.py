@@ -0,0 +1,197 @@
+import re
+import sqlite3
+from itertools import combinations
+
+
+# Words that do not distinguish one company from another.
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'llc', 'ltd', 'limited',
+    'plc', 'gmbh', 'ag', 'sa', 'lp', 'llp', 'the', 'and',
+}
+
+# Blocks larger than this are too unspecific to compare exhaustively.
+MAX_BLOCK_SIZE = 500
+
+# Name prefix lengths used, in turn, to split blocks over MAX_BLOCK_SIZE.
+REFINED_PREFIX_LENGTHS = (8, 12)
+
+DEFAULT_THRESHOLD = 0.9
+
+
+def normalize_name(name):
+    """Lowercase a client name and strip punctuation and legal suffixes."""
+    words = re.sub(r"[^a-z0-9 ]", " ", (name or "").lower().replace("&", " and ")).split()
+    significant = [word for word in words if word not in LEGAL_SUFFIXES]
+    return " ".join(significant or words)
+
+
+def normalize_phone(phone):
+    """Reduce a phone number to its last seven digits."""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-7:] if len(digits) >= 7 else ""
+
+
+def blocking_keys(name, phone):
+    """Return the (key_type, block_key) pairs a client is filed under."""
+    keys = []
+    normalized = normalize_name(name)
+    if normalized:
+        keys.append(('name', normalized.replace(" ", "")[:4]))
+    phone_key = normalize_phone(phone)
+    if phone_key:
+        keys.append(('phone', phone_key))
+    return keys
+
+
+def split_block(block, level=0):
+    """Split an oversized block on longer name prefixes.
+
+    Each client is filed under the prefix of its name and of its name with the
+    words sorted, so "Smith John" and "John Smith" still meet. Returns
+    (blocks, skipped) where skipped holds the blocks that stayed too large.
+    """
+    if len(block) <= MAX_BLOCK_SIZE:
+        return [block], []
+    if level == len(REFINED_PREFIX_LENGTHS):
+        return [], [block]
+
+    length = REFINED_PREFIX_LENGTHS[level]
+    sub_blocks = {}
+    for client in block:
+        words = normalize_name(client[1]).split()
+        for key in {"".join(words)[:length], "".join(sorted(words))[:length]}:
+            sub_blocks.setdefault(key, []).append(client)
+
+    blocks, skipped = [], []
+    for sub_block in sub_blocks.values():
+        if len(sub_block) > 1:
+            more_blocks, more_skipped = split_block(sub_block, level + 1)
+            blocks.extend(more_blocks)
+            skipped.extend(more_skipped)
+    return blocks, skipped
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(a, b):
+    """Jaccard similarity of the character trigrams of two strings."""
+    if not a or not b:
+        return 0.0
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def jaro_winkler(a, b, prefix_scale=0.1):
+    """Jaro-Winkler similarity of two strings, between 0.0 and 1.0."""
+    if a == b:
+        return 1.0 if a else 0.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+
+    window = max(max(len_a, len_b) // 2 - 1, 0)
+    matched_a = [False] * len_a
+    matched_b = [False] * len_b
+    matches = 0
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len_b, i + window + 1)):
+            if not matched_b[j] and b[j] == char:
+                matched_a[i] = matched_b[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    transpositions = 0
+    j = 0
+    for i in range(len_a):
+        if matched_a[i]:
+            while not matched_b[j]:
+                j += 1
+            if a[i] != b[j]:
+                transpositions += 1
+            j += 1
+
+    jaro = (matches / len_a + matches / len_b + (matches - transpositions / 2) / matches) / 3
+    prefix = 0
+    for char_a, char_b in zip(a[:4], b[:4]):
+        if char_a != char_b:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def similarity(client_a, client_b):
+    """Score how likely two (client_id, name, phone) rows are the same client."""
+    name_a, name_b = normalize_name(client_a[1]), normalize_name(client_b[1])
+    score = max(jaro_winkler(name_a, name_b), trigram_similarity(name_a, name_b))
+    phone_a, phone_b = normalize_phone(client_a[2]), normalize_phone(client_b[2])
+    if phone_a and phone_a == phone_b:
+        score = min(1.0, score + 0.1)
+    return score
+
+
+def rebuild_blocking_keys(conn):
+    """Recompute the stored blocking keys for every client in one transaction."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT client_id, client_name, client_phone FROM clients")
+    rows = [(client_id, key_type, block_key)
+            for client_id, name, phone in cursor.fetchall()
+            for key_type, block_key in blocking_keys(name, phone)]
+    try:
+        cursor.execute("DELETE FROM client_keys")
+        cursor.executemany("INSERT INTO client_keys (client_id, key_type, block_key) VALUES (?, ?, ?)", rows)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+def find_duplicate_candidates(conn, threshold=DEFAULT_THRESHOLD, progress_callback=None):
+    """Compare clients that share a blocking key and return likely duplicate pairs.
+
+    Returns (candidates, skipped): candidates is a list of
+    (score, (client_id, name, phone), (client_id, name, phone)) sorted by
+    descending score, skipped lists the (key_type, block_key, size) of blocks
+    still too large to compare after split_block.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT k.key_type, k.block_key, c.client_id, c.client_name, c.client_phone
+        FROM client_keys k
+        JOIN clients c ON c.client_id = k.client_id
+        ORDER BY k.key_type, k.block_key
+    """)
+
+    blocks = {}
+    for key_type, block_key, client_id, name, phone in cursor.fetchall():
+        blocks.setdefault((key_type, block_key), []).append((client_id, name, phone))
+
+    block_list = []
+    skipped = []
+    for (key_type, block_key), block in blocks.items():
+        if len(block) < 2:
+            continue
+        sub_blocks, skipped_blocks = split_block(block)
+        block_list.extend(sub_blocks)
+        skipped.extend((key_type, block_key, len(skipped_block)) for skipped_block in skipped_blocks)
+
+    candidates = []
+    seen = set()
+    for index, block in enumerate(block_list):
+        for client_a, client_b in combinations(block, 2):
+            pair = (min(client_a[0], client_b[0]), max(client_a[0], client_b[0]))
+            if client_a[0] == client_b[0] or pair in seen:
+                continue
+            seen.add(pair)
+            score = similarity(client_a, client_b)
+            if score >= threshold:
+                candidates.append((score, client_a, client_b))
+        if progress_callback is not None:
+            progress_callback(index + 1, len(block_list))
+
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+    return candidates, skipped
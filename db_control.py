@@ -1,8 +1,42 @@
 import sqlite3
 import os
+import json
+import re
+import datetime
 import xml.etree.ElementTree as ET
 from PyQt5.QtWidgets import QMessageBox
 import sys
+import socket
+from contextlib import contextmanager
+from replication import SyncEngine, install_tracking
+from result_set import ResultSet
+from query_builder import QueryBuilder
+
+
+CLIENT_COLUMNS = ('client_id', 'client_name', 'client_address1', 'client_address2',
+                  'client_phone', 'client_emailfax')
+
+# UTC with milliseconds, so entries sort in write order.
+JOURNAL_TIMESTAMP = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+SNAPSHOT_INTERVAL_DAYS = 30
+
+ORDER_COLUMNS = {
+    'order_date': 'TEXT',
+    'status': "TEXT DEFAULT 'open'",
+    'uid': 'TEXT',
+}
+
+MEASUREMENT_COLUMNS = {
+    'uid': 'TEXT',
+}
+
+ARCHIVE_FOLDER = 'Archive'
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_FILE_PATTERN = re.compile(r"^Orders_(\d{4})(?:Q([1-4]))?\.db$")
+
+# SQLite allows ten attached databases by default; one is kept free for merge_clients.
+MAX_ATTACHED_ARCHIVES = 8
 
 
 class DatabaseManager:
@@ -10,7 +44,17 @@ class DatabaseManager:
     def __init__(self):
         self.db_folder = self.ensure_db_directory_exists()
         self.databases = self.load_database_names()
+        self.replication = self.read_replication_settings()
+        if self.replication:
+            self.sync_engine().bootstrap()
         self.connections = self.initialize_databases()
+        if self.replication:
+            self.install_replication_tracking()
+        self.query_builders = {db_name: QueryBuilder(conn) for db_name, conn in self.connections.items()}
+        self.savepoint_counter = 0
+        self.ensure_recent_clients_snapshot()
+        self.archive_period = self.read_archive_period_from_settings()
+        self.archive_folder = os.path.join(self.db_folder, ARCHIVE_FOLDER)
 
     def read_db_path_from_settings(self):
         """Read the database path from the XML settings file."""
@@ -26,6 +70,54 @@ class DatabaseManager:
             QMessageBox.critical(None, "Error", f"Error reading settings: {str(e)}")
             sys.exit(1)
 
+    def read_archive_period_from_settings(self):
+        """Read the orders archive period ('year' or 'quarter') from the XML settings file."""
+        try:
+            tree = ET.parse('settings.xml')
+            period = tree.getroot().find('database/archive_period')
+            if period is not None and period.text in ('year', 'quarter'):
+                return period.text
+        except Exception:
+            pass
+        return 'year'
+
+    def read_replication_settings(self):
+        """Read the replication settings; returns None unless replication is enabled.
+
+        In replication mode database/path is this station's local replica and
+        replication/central is the shared folder holding the central copy.
+        """
+        try:
+            tree = ET.parse('settings.xml')
+            replication = tree.getroot().find('replication')
+            if replication is None or replication.find('enabled').text != "true":
+                return None
+            station = replication.find('station')
+            interval = replication.find('interval_s')
+            return {
+                'central': replication.find('central').text,
+                'station': station.text if station is not None and station.text else socket.gethostname(),
+                'interval_s': int(interval.text) if interval is not None else 60,
+            }
+        except Exception as e:
+            print(f"Error reading replication settings: {str(e)}")
+            return None
+
+    def sync_engine(self):
+        """Create a sync engine between the local replica and the central copy."""
+        return SyncEngine(self.db_folder, self.replication['central'], self.replication['station'],
+                          self.databases)
+
+    def install_replication_tracking(self):
+        """Track row changes in the local replicas so they can be synced."""
+        for db_name, conn in self.connections.items():
+            try:
+                install_tracking(conn, db_name, self.replication['station'])
+            except sqlite3.Error as e:
+                print(f"Error installing change tracking on {db_name}: {str(e)}")
+                QMessageBox.critical(None, "Database Error", f"{db_name}: {str(e)}")
+                sys.exit(1)
+
     def load_database_names(self):
         """Load the names of all databases from settings or a predefined list."""
         # Example: reading from a predefined list
@@ -81,6 +173,22 @@ class DatabaseManager:
             QMessageBox.critical(None, "Database Error", f"Database {db_name} not found.")
             return []
 
+    def fetch_result_set(self, db_name, query, params=None):
+        """Fetch data from the specified database into a column-oriented ResultSet."""
+        if db_name in self.connections:
+            conn = self.connections[db_name]
+            try:
+                cursor = conn.cursor()
+                cursor.execute(query, params or ())
+                return ResultSet.from_cursor(cursor)
+            except sqlite3.Error as e:
+                print(f"Error fetching data from {db_name}: {str(e)}")
+                QMessageBox.critical(None, "Database Error", f"Error fetching data from {db_name}: {str(e)}")
+                return ResultSet([])
+        else:
+            QMessageBox.critical(None, "Database Error", f"Database {db_name} not found.")
+            return ResultSet([])
+
     def add_new_entry(self, db_name, table_name, data):
         """Adds a new entry to a specified table in a specified database."""
         if db_name not in self.connections:
@@ -89,16 +197,11 @@ class DatabaseManager:
 
         conn = self.connections[db_name]
         try:
-            cursor = conn.cursor()
-
-            # Constructing the INSERT query
-            columns = ', '.join(data.keys())
-            placeholders = ', '.join(['?' for _ in data])
-            query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-
-            # Executing the query
-            cursor.execute(query, list(data.values()))
+            query, values = self.query_builders[db_name].insert(table_name, data)
+            conn.execute(query, values)
             conn.commit()
+        except ValueError as e:
+            print(f"Error adding new entry to {db_name}: {str(e)}")
         except sqlite3.Error as e:
             print(f"Error adding new entry to {db_name}: {str(e)}")
             conn.rollback()
@@ -110,50 +213,462 @@ class DatabaseManager:
             return
 
         conn = self.connections[db_name]
+        builder = self.query_builders[db_name]
         try:
-            cursor = conn.cursor()
-
-            # Check if a record with the key already exists
-            select_query = f"SELECT * FROM {table_name} WHERE {key_field} = ?"
-            cursor.execute(select_query, (data[key_field],))
-            exists = cursor.fetchone()
-
-            if exists:
-                # Update existing record
-                fields = ", ".join([f"{k} = ?" for k in data if k != key_field])
-                values = [v for k, v in data.items() if k != key_field]
-                update_query = f"UPDATE {table_name} SET {fields} WHERE {key_field} = ?"
-                cursor.execute(update_query, values + [data[key_field]])
+            # Update the existing record; insert only if there was none to update
+            if len(data) > 1:
+                query, values = builder.update(table_name, key_field, data)
+                exists = conn.execute(query, values).rowcount > 0
             else:
-                # Insert new record
-                placeholders = ", ".join(["?" for _ in data])
-                fields = ", ".join(data.keys())
-                values = list(data.values())
-                insert_query = f"INSERT INTO {table_name} ({fields}) VALUES ({placeholders})"
-                cursor.execute(insert_query, values)
+                query, values = builder.exists(table_name, key_field, data[key_field])
+                exists = conn.execute(query, values).fetchone() is not None
+
+            if not exists:
+                query, values = builder.insert(table_name, data)
+                conn.execute(query, values)
 
             conn.commit()
+        except ValueError as e:
+            print(f"Error writing data to {db_name}: {str(e)}")
         except sqlite3.Error as e:
             print(f"Error writing data to {db_name}: {str(e)}")
             conn.rollback()
 
+    def begin_batch(self, db_name):
+        """Open a transaction that stays open across savepoints until commit_batch."""
+        conn = self.connections[db_name]
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+
+    def commit_batch(self, db_name):
+        """Commit every change made since begin_batch; returns False if they were rolled back."""
+        conn = self.connections[db_name]
+        try:
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error committing changes to {db_name}: {str(e)}")
+            conn.rollback()
+            return False
+
+    @contextmanager
+    def savepoint(self, db_name):
+        """Run a block of statements inside a savepoint of the open batch.
+
+        On error only the savepoint is rolled back; the batch stays open.
+        """
+        conn = self.connections[db_name]
+        self.begin_batch(db_name)
+        self.savepoint_counter += 1
+        name = f"sp_{self.savepoint_counter}"
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield conn
+        except Exception:
+            conn.execute(f"ROLLBACK TO {name}")
+            conn.execute(f"RELEASE {name}")
+            raise
+        conn.execute(f"RELEASE {name}")
+
+    def apply_row(self, db_name, table_name, key_field, key, values, must_exist=None):
+        """Set the row identified by key to values, or delete it if values is None, without committing.
+
+        With must_exist set, nothing is written unless the row's presence matches it;
+        undo/redo use this to notice rows merged away or changed by a sync meanwhile.
+        """
+        builder = self.query_builders[db_name]
+        try:
+            with self.savepoint(db_name) as conn:
+                if must_exist is not None:
+                    exists = conn.execute(*builder.exists(table_name, key_field, key)).fetchone() is not None
+                    if exists != must_exist:
+                        print(f"Not applying change to {table_name} {key}: row was "
+                              f"{'added' if exists else 'removed'} elsewhere.")
+                        return False
+                if values is None:
+                    conn.execute(*builder.delete(table_name, key_field, key))
+                else:
+                    data = dict(values, **{key_field: key})
+                    query, params = builder.update(table_name, key_field, data)
+                    if conn.execute(query, params).rowcount == 0:
+                        conn.execute(*builder.insert(table_name, data))
+            return True
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error applying change to {db_name}: {str(e)}")
+            return False
+
+    def merge_clients(self, keep_client_id, duplicate_client_ids):
+        """Merge duplicate clients into one, rewriting their orders in a single transaction.
+
+        Archived orders are repointed first, one partition at a time; if that fails
+        nothing else is changed, and repeating the merge finishes the job.
+        """
+        duplicate_client_ids = [client_id for client_id in duplicate_client_ids if client_id != keep_client_id]
+        if not duplicate_client_ids:
+            return False
+        if not self.fetch_data('Clients.db', "SELECT 1 FROM clients WHERE client_id = ?", (keep_client_id,)):
+            print(f"Client {keep_client_id} not found.")
+            return False
+
+        conn = self.connections['Orders.db']
+        placeholders = ", ".join(["?" for _ in duplicate_client_ids])
+
+        # Archived orders keep their snapshot of the client; only the id is repointed.
+        for partition in self.list_archive_partitions():
+            try:
+                with self.attached_archives([partition]) as aliases:
+                    conn.execute(f"""
+                        UPDATE {aliases[0]}.orders
+                        SET client_id = ?
+                        WHERE client_id IN ({placeholders})
+                    """, [keep_client_id] + duplicate_client_ids)
+                    conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error merging clients in archive {partition[0]}: {str(e)}")
+                return False
+
+        try:
+            # Attaching Clients.db lets both files commit atomically through one connection.
+            conn.execute("ATTACH DATABASE ? AS clients_db", (os.path.join(self.db_folder, 'Clients.db'),))
+        except sqlite3.Error as e:
+            print(f"Error attaching Clients.db: {str(e)}")
+            return False
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM clients_db.clients WHERE client_id = ?", (keep_client_id,))
+            if cursor.fetchone() is None:
+                print(f"Client {keep_client_id} not found.")
+                return False
+
+            cursor.execute(f"""
+                UPDATE orders
+                SET client_id = c.client_id, client_name = c.client_name, 
+                    client_address1 = c.client_address1, client_address2 = c.client_address2, 
+                    client_phone = c.client_phone, client_emailfax = c.client_emailfax
+                FROM (SELECT * FROM clients_db.clients WHERE client_id = ?) AS c
+                WHERE orders.client_id IN ({placeholders})
+            """, [keep_client_id] + duplicate_client_ids)
+            cursor.execute(f"DELETE FROM clients_db.clients WHERE client_id IN ({placeholders})",
+                           duplicate_client_ids)
+            cursor.execute(f"DELETE FROM clients_db.client_keys WHERE client_id IN ({placeholders})",
+                           duplicate_client_ids)
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error merging clients: {str(e)}")
+            conn.rollback()
+            return False
+        finally:
+            conn.execute("DETACH DATABASE clients_db")
+        return True
+
     def initialize_clients_db(self, cursor):
         try:
             cursor.execute('''CREATE TABLE IF NOT EXISTS clients 
                                (id INTEGER PRIMARY KEY, client_id INTEGER, client_name TEXT, 
                                 client_address1 TEXT, client_address2 TEXT, 
                                 client_phone TEXT, client_emailfax TEXT)''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS client_keys 
+                               (client_id INTEGER, key_type TEXT, block_key TEXT)''')
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_client_keys_block 
+                               ON client_keys (key_type, block_key)''')
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_client_keys_client_id 
+                               ON client_keys (client_id)''')
+            self.initialize_clients_journal(cursor)
         except sqlite3.Error as e:
             print(f"Database Error: {str(e)}")
             QMessageBox.critical(None, "Database Error", str(e))
             sys.exit(1)
 
+    def initialize_clients_journal(self, cursor):
+        """Create the append-only change journal, its triggers and the snapshot table."""
+        cursor.execute('''CREATE TABLE IF NOT EXISTS clients_journal 
+                           (seq INTEGER PRIMARY KEY, client_id INTEGER, operation TEXT, 
+                            changed_at TEXT, old_values TEXT, new_values TEXT)''')
+        cursor.execute('''CREATE INDEX IF NOT EXISTS idx_clients_journal_client 
+                           ON clients_journal (client_id, changed_at)''')
+        cursor.execute('''CREATE TABLE IF NOT EXISTS clients_snapshots 
+                           (snapshot_id INTEGER, taken_at TEXT, client_id INTEGER, row_values TEXT)''')
+        cursor.execute('''CREATE INDEX IF NOT EXISTS idx_clients_snapshots_client 
+                           ON clients_snapshots (client_id, taken_at)''')
+
+        row_json = {
+            prefix: "json_object(" + ", ".join(f"'{column}', {prefix}.{column}" for column in CLIENT_COLUMNS) + ")"
+            for prefix in ('OLD', 'NEW')
+        }
+        changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in CLIENT_COLUMNS)
+
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS clients_journal_insert AFTER INSERT ON clients 
+                           BEGIN 
+                               INSERT INTO clients_journal (client_id, operation, changed_at, old_values, new_values) 
+                               VALUES (NEW.client_id, 'INSERT', {JOURNAL_TIMESTAMP}, NULL, {row_json['NEW']}); 
+                           END''')
+        # Writes that leave the row unchanged are not journaled.
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS clients_journal_update AFTER UPDATE ON clients 
+                           WHEN {changed} 
+                           BEGIN 
+                               INSERT INTO clients_journal (client_id, operation, changed_at, old_values, new_values) 
+                               VALUES (NEW.client_id, 'UPDATE', {JOURNAL_TIMESTAMP}, {row_json['OLD']}, {row_json['NEW']}); 
+                           END''')
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS clients_journal_delete AFTER DELETE ON clients 
+                           BEGIN 
+                               INSERT INTO clients_journal (client_id, operation, changed_at, old_values, new_values) 
+                               VALUES (OLD.client_id, 'DELETE', {JOURNAL_TIMESTAMP}, {row_json['OLD']}, NULL); 
+                           END''')
+
+    def take_clients_snapshot(self):
+        """Copy every current client row into the snapshot table."""
+        conn = self.connections['Clients.db']
+        row_json = "json_object(" + ", ".join(f"'{column}', {column}" for column in CLIENT_COLUMNS) + ")"
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(snapshot_id), 0) + 1 FROM clients_snapshots")
+            snapshot_id = cursor.fetchone()[0]
+            cursor.execute(f"""
+                INSERT INTO clients_snapshots (snapshot_id, taken_at, client_id, row_values) 
+                SELECT ?, {JOURNAL_TIMESTAMP}, client_id, {row_json} FROM clients
+            """, (snapshot_id,))
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error taking clients snapshot: {str(e)}")
+            conn.rollback()
+
+    def ensure_recent_clients_snapshot(self, max_age_days=SNAPSHOT_INTERVAL_DAYS):
+        """Take a snapshot if the latest one is older than max_age_days."""
+        query = "SELECT MAX(taken_at) >= datetime('now', ?) FROM clients_snapshots"
+        recent = self.fetch_data('Clients.db', query, (f"-{max_age_days} days",))
+        if not recent or not recent[0][0]:
+            self.take_clients_snapshot()
+
+    def fetch_client_history(self, client_id):
+        """Return (changed_at, operation, old_values, new_values) journal entries for a client, oldest first."""
+        query = """
+            SELECT datetime(changed_at, 'localtime'), operation, old_values, new_values 
+            FROM clients_journal 
+            WHERE client_id = ? 
+            ORDER BY changed_at, seq
+        """
+        return [(changed_at, operation,
+                 json.loads(old_values) if old_values else None,
+                 json.loads(new_values) if new_values else None)
+                for changed_at, operation, old_values, new_values
+                in self.fetch_data('Clients.db', query, (client_id,))]
+
+    def reconstruct_client(self, client_id, as_of):
+        """Return a client's field values as of a local 'YYYY-MM-DD HH:MM:SS' time, or None.
+
+        Each journal entry and snapshot holds a full row image, so the state at any
+        time is the later of the last journal entry and the last snapshot before it;
+        nothing has to be replayed. Snapshots cover rows that predate the journal.
+        """
+        query = """
+            SELECT changed_at, new_values FROM (
+                SELECT changed_at, new_values, seq FROM clients_journal 
+                WHERE client_id = ? AND changed_at < datetime(?, 'utc', '+1 second') 
+                ORDER BY changed_at DESC, seq DESC LIMIT 1
+            ) 
+            UNION ALL 
+            SELECT * FROM (
+                SELECT taken_at, row_values FROM clients_snapshots 
+                WHERE client_id = ? AND taken_at < datetime(?, 'utc', '+1 second') 
+                ORDER BY taken_at DESC LIMIT 1
+            ) 
+            ORDER BY 1 DESC LIMIT 1
+        """
+        rows = self.fetch_data('Clients.db', query, (client_id, as_of, client_id, as_of))
+        if not rows or rows[0][1] is None:
+            return None
+        return json.loads(rows[0][1])
+
+    def archive_partition_name(self, order_date):
+        """Return the archive file name for an order date ('YYYY-MM-DD')."""
+        year, month = int(order_date[:4]), int(order_date[5:7])
+        if self.archive_period == 'quarter':
+            return f"Orders_{year}Q{(month - 1) // 3 + 1}.db"
+        return f"Orders_{year}.db"
+
+    def current_partition_start(self):
+        """Return the first date of the period held in the hot Orders.db."""
+        today = datetime.date.today()
+        if self.archive_period == 'quarter':
+            return today.replace(month=(today.month - 1) // 3 * 3 + 1, day=1).isoformat()
+        return today.replace(month=1, day=1).isoformat()
+
+    def list_archive_partitions(self):
+        """Return (file_name, start_date, end_date) for every archive file, oldest first."""
+        if not os.path.isdir(self.archive_folder):
+            return []
+
+        partitions = []
+        for file_name in os.listdir(self.archive_folder):
+            match = ARCHIVE_FILE_PATTERN.match(file_name)
+            if not match:
+                continue
+            year, quarter = int(match.group(1)), match.group(2)
+            if quarter:
+                start = datetime.date(year, (int(quarter) - 1) * 3 + 1, 1)
+                end = datetime.date(year + 1, 1, 1) if quarter == '4' else datetime.date(year, int(quarter) * 3 + 1, 1)
+            else:
+                start, end = datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+            partitions.append((file_name, start.isoformat(), end.isoformat()))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    @contextmanager
+    def attached_archives(self, partitions):
+        """Attach archive files to the Orders.db connection, yielding their schema aliases."""
+        conn = self.connections['Orders.db']
+        aliases = []
+        try:
+            for index, (file_name, _, _) in enumerate(partitions):
+                alias = f"archive_{index}"
+                conn.execute("ATTACH DATABASE ? AS " + alias, (os.path.join(self.archive_folder, file_name),))
+                aliases.append(alias)
+            yield aliases
+        except sqlite3.Error:
+            # A database cannot be detached while a transaction is open on it.
+            conn.rollback()
+            raise
+        finally:
+            for alias in aliases:
+                conn.execute("DETACH DATABASE " + alias)
+
+    def fetch_orders(self, columns="*", where="", params=(), date_from=None, date_to=None, order_by=""):
+        """Fetch orders, reading archive partitions only when the date range reaches them.
+
+        Without date_from only the hot Orders.db is queried. date_from and date_to
+        ('YYYY-MM-DD', end exclusive) select the archive files whose period overlaps
+        the range; the same WHERE clause is applied to every partition. order_by
+        sorts within each group of MAX_ATTACHED_ARCHIVES attached files.
+        """
+        conditions = [where] if where else []
+        range_params = []
+        if date_from is not None:
+            conditions.append("order_date >= ?")
+            range_params.append(date_from)
+        if date_to is not None:
+            conditions.append("order_date < ?")
+            range_params.append(date_to)
+        where_clause = f"WHERE {' AND '.join(f'({c})' for c in conditions)}" if conditions else ""
+        branch_params = list(params) + range_params
+
+        partitions = []
+        if date_from is not None and date_from < self.current_partition_start():
+            partitions = [partition for partition in self.list_archive_partitions()
+                          if partition[2] > date_from and (date_to is None or partition[1] < date_to)]
+
+        results = []
+        hot_query = f"SELECT {columns} FROM main.orders {where_clause}"
+        # Attach in groups to stay under SQLite's attached-database limit.
+        for start in range(0, max(len(partitions), 1), MAX_ATTACHED_ARCHIVES):
+            group = partitions[start:start + MAX_ATTACHED_ARCHIVES]
+            try:
+                with self.attached_archives(group) as aliases:
+                    branches = [f"SELECT {columns} FROM {alias}.orders {where_clause}" for alias in aliases]
+                    if start == 0:
+                        branches.insert(0, hot_query)
+                    query = " UNION ALL ".join(branches) + (f" ORDER BY {order_by}" if order_by else "")
+                    results.extend(self.fetch_data('Orders.db', query, branch_params * len(branches)))
+            except sqlite3.Error as e:
+                print(f"Error attaching order archives: {str(e)}")
+
+        return results
+
+    def archive_closed_orders(self, before_date=None, batch_size=ARCHIVE_BATCH_SIZE, progress_callback=None):
+        """Move closed orders dated before before_date into their archive files.
+
+        Orders and their measurements move in batches, each batch in one transaction
+        spanning Orders.db and the attached archive file. Returns the number moved.
+        """
+        if self.replication:
+            # Deleting archived rows would replicate as deletions to every station.
+            print("Archiving is not available in replication mode.")
+            return 0
+
+        before_date = before_date or self.current_partition_start()
+        conn = self.connections['Orders.db']
+        os.makedirs(self.archive_folder, exist_ok=True)
+
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(orders)")
+        order_columns = ", ".join(row[1] for row in cursor.fetchall())
+        # Measurement ids are reused once archived rows are deleted, so the archive assigns its own.
+        cursor.execute("PRAGMA table_info(measurements)")
+        measurement_columns = ", ".join(row[1] for row in cursor.fetchall() if not row[5])
+
+        moved = 0
+        while True:
+            # The newest id is never moved, so new orders cannot reuse an archived id.
+            batch = self.fetch_data('Orders.db', """
+                SELECT id, order_date FROM orders
+                WHERE status = 'closed' AND order_date < ? AND id < (SELECT MAX(id) FROM orders)
+                ORDER BY order_date LIMIT ?
+            """, (before_date, batch_size))
+            if not batch:
+                break
+
+            by_partition = {}
+            for order_id, order_date in batch:
+                by_partition.setdefault(self.archive_partition_name(order_date), []).append(order_id)
+
+            for file_name, order_ids in by_partition.items():
+                archive_path = os.path.join(self.archive_folder, file_name)
+                if not os.path.exists(archive_path):
+                    archive_conn = sqlite3.connect(archive_path)
+                    self.initialize_orders_db(archive_conn.cursor())
+                    archive_conn.close()
+
+                placeholders = ", ".join(["?" for _ in order_ids])
+                try:
+                    with self.attached_archives([(file_name, None, None)]) as aliases:
+                        archive = aliases[0]
+                        cursor.execute(f"""
+                            INSERT INTO {archive}.orders ({order_columns})
+                            SELECT {order_columns} FROM main.orders WHERE id IN ({placeholders})
+                        """, order_ids)
+                        cursor.execute(f"""
+                            INSERT INTO {archive}.measurements ({measurement_columns})
+                            SELECT {measurement_columns} FROM main.measurements WHERE order_id IN ({placeholders})
+                        """, order_ids)
+                        cursor.execute(f"DELETE FROM main.measurements WHERE order_id IN ({placeholders})", order_ids)
+                        cursor.execute(f"DELETE FROM main.orders WHERE id IN ({placeholders})", order_ids)
+                        conn.commit()
+                except sqlite3.Error as e:
+                    print(f"Error archiving orders to {file_name}: {str(e)}")
+                    conn.rollback()
+                    return moved
+                moved += len(order_ids)
+
+            if progress_callback is not None:
+                progress_callback(moved)
+        return moved
+
+    def add_missing_columns(self, cursor, table_name, columns):
+        """Add columns introduced after a table was first created."""
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for column, column_type in columns.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {column_type}")
+
     def initialize_orders_db(self, cursor):
         try:
             cursor.execute('''CREATE TABLE IF NOT EXISTS orders 
                                (id INTEGER PRIMARY KEY, client_id INTEGER, client_name TEXT, 
                                 client_address1 TEXT, client_address2 TEXT, 
-                                client_phone TEXT, client_emailfax TEXT)''')
+                                client_phone TEXT, client_emailfax TEXT, 
+                                order_date TEXT, status TEXT DEFAULT 'open', uid TEXT)''')
+            self.add_missing_columns(cursor, 'orders', ORDER_COLUMNS)
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_orders_status_date 
+                               ON orders (status, order_date)''')
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_orders_client_id 
+                               ON orders (client_id)''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS measurements 
+                               (id INTEGER PRIMARY KEY, order_id INTEGER, feature TEXT, 
+                                nominal REAL, tolerance_plus REAL, tolerance_minus REAL, 
+                                measured REAL, uid TEXT)''')
+            self.add_missing_columns(cursor, 'measurements', MEASUREMENT_COLUMNS)
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_measurements_order_id 
+                               ON measurements (order_id)''')
         except sqlite3.Error as e:
             print(f"Database Error: {str(e)}")
             QMessageBox.critical(None, "Database Error", str(e))
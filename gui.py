@@ -1,15 +1,139 @@
 # Standard library imports
+import os
 import random
+import sqlite3
+import time
+from array import array
 
 # PyQt5 imports
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QLineEdit, QPushButton, QListWidget, QFormLayout,
-                             QFrame, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView)
-from PyQt5.QtGui import QFont, QIntValidator, QRegExpValidator
-from PyQt5.QtCore import QRegExp, Qt
+                             QFrame, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView,
+                             QDialog, QProgressBar, QDateTimeEdit, QTableView, QUndoStack, QUndoCommand,
+                             QApplication)
+from PyQt5.QtGui import QFont, QIntValidator, QRegExpValidator, QKeySequence
+from PyQt5.QtCore import (QRegExp, Qt, QThread, pyqtSignal, QDateTime, QAbstractTableModel, QModelIndex,
+                          QTimer)
 
 # Local application imports
 from special_classes import EnterLineEdit
+from perf_monitor import instrumented
+from result_set import ResultSet
+from client_dedup import rebuild_blocking_keys, find_duplicate_candidates
+from db_control import CLIENT_COLUMNS
+
+
+# Edits to the same client closer together than this are undone as one step.
+EDIT_COALESCE_SECONDS = 2.0
+
+# Pending edits are committed, and the client list refreshed, this long after the last one.
+COMMIT_DELAY_MS = 1000
+
+# ...but never later than this after the first one: the open batch keeps Clients.db
+# write-locked, and other writers such as the sync give up after a 5 s busy timeout.
+MAX_BATCH_AGE_MS = 3000
+
+
+class ResultSetTableModel(QAbstractTableModel):
+    """Table model reading cells straight from a ResultSet.
+
+    Values are handed to the view only for the cells it paints; sorting permutes
+    a row index instead of moving data.
+    """
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.result_set = ResultSet([])
+        self.order = array('l')
+        self.sort_column = None
+        self.sort_order = Qt.AscendingOrder
+
+    def set_result_set(self, result_set):
+        self.beginResetModel()
+        self.result_set = result_set
+        self.order = array('l', range(len(result_set)))
+        if self.sort_column is not None:
+            self.apply_sort()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        value = self.result_set.value(self.order[index.row()], index.column())
+        return "" if value is None else value
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.sort_column, self.sort_order = column, order
+        self.apply_sort()
+        self.layoutChanged.emit()
+
+    def apply_sort(self):
+        if self.sort_column >= len(self.result_set.column_names):
+            return
+        values = self.result_set.column(self.sort_column)
+        descending = self.sort_order == Qt.DescendingOrder
+
+        def key(row):
+            value = values[row]
+            return (value is None, 0 if value is None else value)
+
+        try:
+            ordered = sorted(self.order, key=key, reverse=descending)
+        except TypeError:
+            ordered = sorted(self.order, key=lambda row: str(values[row] or ""), reverse=descending)
+        self.order = array('l', ordered)
+
+    def row_values(self, row):
+        return self.result_set[self.order[row]]
+
+
+class ClientEditCommand(QUndoCommand):
+    """Undoable change of one client, applied through DatabaseManager savepoints.
+
+    old_values is None for a newly created client, so undoing it deletes the row.
+    """
+    def __init__(self, window, client_id, old_values, new_values):
+        super().__init__(f"Edit client {client_id}")
+        self.window = window
+        self.client_id = client_id
+        self.old_values = old_values
+        self.new_values = new_values
+        self.last_edit = time.monotonic()
+
+    def id(self):
+        return 1
+
+    def mergeWith(self, other):
+        # Rapid successive saves of one client become a single undo step.
+        if (other.client_id != self.client_id or other.old_values is None or other.isObsolete()
+                or other.last_edit - self.last_edit > EDIT_COALESCE_SECONDS):
+            return False
+        self.new_values = other.new_values
+        self.last_edit = other.last_edit
+        return True
+
+    # A change that cannot be applied is made obsolete, so QUndoStack drops it
+    # rather than keeping a step that never happened.
+
+    def redo(self):
+        if not self.window.apply_client_values(self.client_id, self.new_values, self.old_values is not None):
+            self.setObsolete(True)
+
+    def undo(self):
+        if not self.window.apply_client_values(self.client_id, self.old_values, self.new_values is not None):
+            self.setObsolete(True)
 
 
 class ClientWindow(QMainWindow):
@@ -33,11 +157,23 @@ class ClientWindow(QMainWindow):
         self.load_button = None
         self.delete_button = None
         self.clear_button = None
+        self.duplicates_button = None
+        self.history_button = None
+        self.undo_button = None
+        self.redo_button = None
         self.client_table = None
+        self.client_model = None
         self.contact_table = None
         self.search_bar = None
 
-        self.client_table = QTableWidget()
+        self.client_table = QTableView()
+
+        self.undo_stack = QUndoStack(self)
+        self.commit_timer = QTimer(self)
+        self.commit_timer.setSingleShot(True)
+        self.commit_timer.timeout.connect(self.flush_edits)
+        self.batch_started = None
+        QApplication.instance().aboutToQuit.connect(self.flush_edits)
 
         self.initializeUI()
         self.search_clients("")
@@ -164,19 +300,47 @@ class ClientWindow(QMainWindow):
         self.load_button = QPushButton("Load Customer")
         self.delete_button = QPushButton("Delete Customer")
         self.clear_button = QPushButton("Clear Fields")
+        self.duplicates_button = QPushButton("Find Duplicates")
+        self.history_button = QPushButton("History")
+        self.undo_button = QPushButton("Undo")
+        self.redo_button = QPushButton("Redo")
 
         self.submit_button.setFont(font)
         self.load_button.setFont(font)
         self.delete_button.setFont(font)
         self.clear_button.setFont(font)
+        self.duplicates_button.setFont(font)
+        self.history_button.setFont(font)
+        self.undo_button.setFont(font)
+        self.redo_button.setFont(font)
 
         button_layout.addWidget(self.submit_button)
         button_layout.addWidget(self.load_button)
         button_layout.addWidget(self.delete_button)
         button_layout.addWidget(self.clear_button)
+        button_layout.addWidget(self.duplicates_button)
+        button_layout.addWidget(self.history_button)
+        button_layout.addWidget(self.undo_button)
+        button_layout.addWidget(self.redo_button)
 
         self.submit_button.clicked.connect(self.amend_client)
         self.clear_button.clicked.connect(self.clear_fields)
+        self.duplicates_button.clicked.connect(self.find_duplicates)
+        self.history_button.clicked.connect(self.show_history)
+        self.undo_button.clicked.connect(self.undo_stack.undo)
+        self.redo_button.clicked.connect(self.undo_stack.redo)
+
+        self.undo_button.setEnabled(False)
+        self.redo_button.setEnabled(False)
+        self.undo_stack.canUndoChanged.connect(self.undo_button.setEnabled)
+        self.undo_stack.canRedoChanged.connect(self.redo_button.setEnabled)
+
+        undo_action = self.undo_stack.createUndoAction(self, "Undo")
+        undo_action.setShortcut(QKeySequence.Undo)
+        redo_action = self.undo_stack.createRedoAction(self, "Redo")
+        redo_action.setShortcut(QKeySequence.Redo)
+        self.addAction(undo_action)
+        self.addAction(redo_action)
 
     def setupClientLayout(self, layout):
         """Sets up the client and contact table UI components."""
@@ -204,16 +368,16 @@ class ClientWindow(QMainWindow):
     def setupClientTable(self):
 
         # Client table
-        self.client_table = QTableWidget()
+        self.client_model = ResultSetTableModel(["ID", "Client Name", "Address 1", "Address 2"], self)
+        self.client_table = QTableView()
+        self.client_table.setModel(self.client_model)
         self.client_table.setAlternatingRowColors(True)
-        self.client_table.setColumnCount(4)
-        self.client_table.setHorizontalHeaderLabels(["ID", "Client Name", "Address 1", "Address 2"])
 
-        self.client_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.client_table.setSelectionMode(QTableWidget.SingleSelection)
-        self.client_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.client_table.setSelectionBehavior(QTableView.SelectRows)
+        self.client_table.setSelectionMode(QTableView.SingleSelection)
+        self.client_table.setEditTriggers(QTableView.NoEditTriggers)
 
-        self.client_table.itemDoubleClicked.connect(self.load_client_data)
+        self.client_table.doubleClicked.connect(self.load_client_data)
 
         self.client_table.setSortingEnabled(True)
         self.client_table.sortByColumn(1, Qt.AscendingOrder)
@@ -253,6 +417,7 @@ class ClientWindow(QMainWindow):
         self.contact_table.setColumnWidth(1, 100)
         self.contact_table.setColumnWidth(2, 100)
 
+    @instrumented('ClientWindow.search_clients')
     def search_clients(self, text):
         """Searches for clients based on the provided text."""
         if not text.strip():
@@ -272,18 +437,13 @@ class ClientWindow(QMainWindow):
             search_text = f"%{text}%"
             parameters = (search_text, search_text, search_text)
 
-        results = self.db_manager.fetch_data('Clients.db', query, parameters)
-
-        self.client_table.setRowCount(len(results))
-        for row_number, row_data in enumerate(results):
-            for column_number, data in enumerate(row_data):
-                cell = QTableWidgetItem(str(data))
-                self.client_table.setItem(row_number, column_number, cell)
+        results = self.db_manager.fetch_result_set('Clients.db', query, parameters)
+        self.client_model.set_result_set(results)
 
-    def load_client_data(self, item):
+    @instrumented('ClientWindow.load_client_data')
+    def load_client_data(self, index):
         """Loads client data from the database."""
-        row = item.row()
-        client_id = int(self.client_table.item(row, 0).text())  # Assuming ID is in the first column
+        client_id = self.client_model.row_values(index.row())[0]  # Assuming ID is in the first column
         query = """
             SELECT client_id, client_name, client_address1, client_address2, 
                    client_phone, client_emailfax 
@@ -316,6 +476,7 @@ class ClientWindow(QMainWindow):
         self.contact_phone_entry.clear()
         self.contact_emailfax_entry.clear()
 
+    @instrumented('ClientWindow.amend_client')
     def amend_client(self):
         client_id_text = self.client_id_entry.text()
         client_data = {
@@ -329,25 +490,84 @@ class ClientWindow(QMainWindow):
         if client_id_text:
             try:
                 client_id = int(client_id_text)
-                client_data['client_id'] = client_id
             except ValueError:
                 QMessageBox.warning(self, "Warning", "Invalid Client ID.")
                 return
 
-            query = "SELECT * FROM clients WHERE client_id = ?"
-            existing_client = self.db_manager.fetch_data('Clients.db', query, (client_id,))
-            if existing_client:
-                self.db_manager.write_data('Clients.db', 'clients', 'client_id', client_data)
-            else:
+            old_values = self.fetch_client_values(client_id)
+            if old_values is None:
                 QMessageBox.information(self, "Information", "Client ID not found.")
+                return
+            if old_values == client_data:
+                return
+            self.undo_stack.push(ClientEditCommand(self, client_id, old_values, client_data))
         else:
             new_id = self.generate_unique_client_id()
-            client_data['client_id'] = new_id
-            self.db_manager.add_new_entry('Clients.db', 'clients', client_data)
+            self.undo_stack.push(ClientEditCommand(self, new_id, None, client_data))
             self.client_id_entry.setText(str(new_id))
 
-        current_search_text = self.search_bar.text()
-        self.search_clients(current_search_text)
+    def fetch_client_values(self, client_id):
+        """Returns the client's editable fields as a dict, or None if there is no such client."""
+        columns = [column for column in CLIENT_COLUMNS if column != 'client_id']
+        query, params = self.db_manager.query_builders['Clients.db'].select_client(client_id, columns)
+        rows = self.db_manager.fetch_data('Clients.db', query, params)
+        return dict(zip(columns, rows[0])) if rows else None
+
+    def apply_client_values(self, client_id, values, must_exist=None):
+        """Writes a client's fields (or deletes it) and schedules the batched commit; returns success."""
+        if not self.db_manager.apply_row('Clients.db', 'clients', 'client_id', client_id, values, must_exist):
+            QMessageBox.critical(self, "Database Error",
+                                 f"Client {client_id} was not changed: it was merged, deleted or added "
+                                 "elsewhere, or saving failed. The step has been removed from the undo history.")
+            return False
+
+        # Keep the form in step with undo/redo of the client being edited.
+        if self.client_id_entry.text() == str(client_id):
+            if values is None:
+                self.clear_fields()
+            else:
+                self.client_name_entry.setText(values['client_name'])
+                self.client_address1_entry.setText(values['client_address1'])
+                self.client_address2_entry.setText(values['client_address2'])
+                self.client_phone_entry.setText(values['client_phone'])
+                self.client_emailfax_entry.setText(values['client_emailfax'])
+
+        # Restarting the timer folds a burst of edits into one commit and one refresh.
+        now = time.monotonic()
+        if self.batch_started is None:
+            self.batch_started = now
+        remaining_ms = MAX_BATCH_AGE_MS - int((now - self.batch_started) * 1000)
+        self.commit_timer.start(max(0, min(COMMIT_DELAY_MS, remaining_ms)))
+        return True
+
+    def flush_edits(self):
+        """Commits pending edits and refreshes the client list."""
+        self.commit_timer.stop()
+        self.batch_started = None
+        if not self.db_manager.commit_batch('Clients.db'):
+            # The edits were rolled back, so the undo history no longer matches the database.
+            self.undo_stack.clear()
+            QMessageBox.critical(self, "Database Error",
+                                 "Saving your recent client changes failed; they have been discarded.")
+        self.search_clients(self.search_bar.text())
+
+    def find_duplicates(self):
+        """Opens the duplicate client review dialog."""
+        self.flush_edits()  # The background search needs the pending edits committed
+        dialog = DuplicateClientsDialog(self.db_manager, self)
+        dialog.exec_()
+        self.search_clients(self.search_bar.text())
+
+    def show_history(self):
+        """Opens the change history of the loaded client."""
+        self.flush_edits()
+        client_id_text = self.client_id_entry.text()
+        if not client_id_text:
+            QMessageBox.information(self, "Information", "Load a client to view its history.")
+            return
+
+        dialog = ClientHistoryDialog(self.db_manager, int(client_id_text), self)
+        dialog.exec_()
 
     def generate_unique_client_id(self):
         while True:
@@ -355,3 +575,240 @@ class ClientWindow(QMainWindow):
             query = "SELECT * FROM clients WHERE client_id = ?"
             if not self.db_manager.fetch_data('Clients.db', query, (new_id,)):
                 return new_id
+
+
+class ClientHistoryDialog(QDialog):
+    FIELD_LABELS = [
+        ('client_name', "Client Name:"),
+        ('client_address1', "Address:"),
+        ('client_address2', "Address:"),
+        ('client_phone', "Phone #:"),
+        ('client_emailfax', "Email/Fax:"),
+    ]
+
+    def __init__(self, db_manager, client_id, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.client_id = client_id
+
+        # Initialize all instance attributes
+        self.history_table = None
+        self.as_of_entry = None
+        self.as_of_button = None
+        self.as_of_labels = {}
+
+        self.initializeUI()
+        self.load_history()
+
+    def initializeUI(self):
+        """Initializes the UI components of the dialog."""
+        self.setWindowTitle(f"Client History - {self.client_id}")
+        self.resize(800, 500)
+        layout = QVBoxLayout(self)
+
+        self.history_table = QTableWidget()
+        self.history_table.setAlternatingRowColors(True)
+        self.history_table.setColumnCount(5)
+        self.history_table.setHorizontalHeaderLabels(["Changed At", "Operation", "Field", "Old Value", "New Value"])
+        self.history_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        header = self.history_table.horizontalHeader()
+        header.setSectionResizeMode(3, QHeaderView.Stretch)
+        header.setSectionResizeMode(4, QHeaderView.Stretch)
+        layout.addWidget(self.history_table)
+
+        as_of_frame = QFrame()
+        as_of_frame.setFrameShape(QFrame.StyledPanel)
+        as_of_layout = QFormLayout(as_of_frame)
+        layout.addWidget(as_of_frame)
+
+        label_font = QFont("Arial", 10, QFont.Bold)
+
+        self.as_of_entry = QDateTimeEdit(QDateTime.currentDateTime())
+        self.as_of_entry.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        self.as_of_entry.setCalendarPopup(True)
+        self.as_of_button = QPushButton("Show As Of")
+        self.as_of_button.clicked.connect(self.show_as_of)
+
+        as_of_row = QHBoxLayout()
+        as_of_row.addWidget(self.as_of_entry)
+        as_of_row.addWidget(self.as_of_button)
+        as_of_label = QLabel("As Of:")
+        as_of_label.setFont(label_font)
+        as_of_layout.addRow(as_of_label, as_of_row)
+
+        for field, label_text in self.FIELD_LABELS:
+            label = QLabel(label_text)
+            label.setFont(label_font)
+            self.as_of_labels[field] = QLabel("")
+            as_of_layout.addRow(label, self.as_of_labels[field])
+
+    def load_history(self):
+        """Fills the table with one row per changed field, newest first."""
+        rows = []
+        for changed_at, operation, old_values, new_values in reversed(self.db_manager.fetch_client_history(self.client_id)):
+            old_values = old_values or {}
+            new_values = new_values or {}
+            for field, _ in self.FIELD_LABELS:
+                old_value, new_value = old_values.get(field), new_values.get(field)
+                if operation == 'UPDATE' and old_value == new_value:
+                    continue
+                rows.append([changed_at, operation, field,
+                             "" if old_value is None else str(old_value),
+                             "" if new_value is None else str(new_value)])
+
+        self.history_table.setRowCount(len(rows))
+        for row_number, row_data in enumerate(rows):
+            for column_number, data in enumerate(row_data):
+                self.history_table.setItem(row_number, column_number, QTableWidgetItem(data))
+
+    def show_as_of(self):
+        """Shows the client record as it was at the selected time."""
+        as_of = self.as_of_entry.dateTime().toString("yyyy-MM-dd HH:mm:ss")
+        values = self.db_manager.reconstruct_client(self.client_id, as_of)
+        if values is None:
+            QMessageBox.information(self, "Information", f"No record of this client as of {as_of}.")
+        for field, label in self.as_of_labels.items():
+            value = (values or {}).get(field)
+            label.setText("" if value is None else str(value))
+
+
+class DedupThread(QThread):
+    """Rebuilds the blocking index and scores candidate duplicates off the GUI thread."""
+    progress = pyqtSignal(int, int)
+    candidates_found = pyqtSignal(list, list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+
+    def run(self):
+        # SQLite connections cannot be shared across threads, so the worker opens its own.
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rebuild_blocking_keys(conn)
+            candidates, skipped = find_duplicate_candidates(conn, progress_callback=self.progress.emit)
+            self.candidates_found.emit(candidates, skipped)
+        except sqlite3.Error as e:
+            print(f"Error finding duplicate clients: {str(e)}")
+            self.failed.emit(str(e))
+        finally:
+            conn.close()
+
+
+class DuplicateClientsDialog(QDialog):
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+
+        # Initialize all instance attributes
+        self.candidates = []
+        self.skipped = []
+        self.progress_bar = None
+        self.skipped_label = None
+        self.candidate_table = None
+        self.keep_first_button = None
+        self.keep_second_button = None
+        self.dedup_thread = None
+
+        self.initializeUI()
+        self.start_search()
+
+    def initializeUI(self):
+        """Initializes the UI components of the dialog."""
+        self.setWindowTitle("Duplicate Clients")
+        self.resize(800, 400)
+        layout = QVBoxLayout(self)
+
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+
+        self.skipped_label = QLabel()
+        self.skipped_label.setWordWrap(True)
+        self.skipped_label.hide()
+        layout.addWidget(self.skipped_label)
+
+        self.candidate_table = QTableWidget()
+        self.candidate_table.setAlternatingRowColors(True)
+        self.candidate_table.setColumnCount(5)
+        self.candidate_table.setHorizontalHeaderLabels(["Score", "ID", "Client Name", "ID", "Client Name"])
+        self.candidate_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.candidate_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.candidate_table.setEditTriggers(QTableWidget.NoEditTriggers)
+
+        header = self.candidate_table.horizontalHeader()
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
+        header.setSectionResizeMode(4, QHeaderView.Stretch)
+        layout.addWidget(self.candidate_table)
+
+        button_layout = QHBoxLayout()
+        self.keep_first_button = QPushButton("Merge Into First")
+        self.keep_second_button = QPushButton("Merge Into Second")
+        button_layout.addWidget(self.keep_first_button)
+        button_layout.addWidget(self.keep_second_button)
+        layout.addLayout(button_layout)
+
+        self.keep_first_button.clicked.connect(lambda: self.merge_selected(keep_first=True))
+        self.keep_second_button.clicked.connect(lambda: self.merge_selected(keep_first=False))
+
+    def start_search(self):
+        """Starts the background duplicate search."""
+        self.keep_first_button.setEnabled(False)
+        self.keep_second_button.setEnabled(False)
+
+        db_path = os.path.join(self.db_manager.db_folder, 'Clients.db')
+        self.dedup_thread = DedupThread(db_path, self)
+        self.dedup_thread.progress.connect(self.update_progress)
+        self.dedup_thread.candidates_found.connect(self.show_candidates)
+        self.dedup_thread.failed.connect(
+            lambda message: QMessageBox.critical(self, "Database Error", message))
+        self.dedup_thread.start()
+
+    def update_progress(self, done, total):
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(done)
+
+    def show_candidates(self, candidates, skipped):
+        """Fills the table with the candidate duplicate pairs and notes any blocks left out."""
+        self.candidates = candidates
+        self.skipped = skipped
+        if skipped:
+            examples = ", ".join(f"{key_type} '{block_key}'" for key_type, block_key, _ in skipped[:3])
+            self.skipped_label.setText(
+                f"{sum(size for _, _, size in skipped)} clients in {len(skipped)} very common groups "
+                f"({examples}) were too many to compare and may hide further duplicates.")
+            self.skipped_label.show()
+        self.candidate_table.setRowCount(len(candidates))
+        for row_number, (score, client_a, client_b) in enumerate(candidates):
+            for column_number, data in enumerate([f"{score:.2f}", client_a[0], client_a[1],
+                                                  client_b[0], client_b[1]]):
+                self.candidate_table.setItem(row_number, column_number, QTableWidgetItem(str(data)))
+
+        self.progress_bar.setValue(self.progress_bar.maximum())
+        self.keep_first_button.setEnabled(bool(candidates))
+        self.keep_second_button.setEnabled(bool(candidates))
+
+    def merge_selected(self, keep_first):
+        """Merges the selected pair, keeping the chosen client."""
+        row = self.candidate_table.currentRow()
+        if row < 0:
+            QMessageBox.information(self, "Information", "Select a pair to merge.")
+            return
+
+        _, client_a, client_b = self.candidates[row]
+        keep, duplicate = (client_a, client_b) if keep_first else (client_b, client_a)
+        answer = QMessageBox.question(
+            self, "Merge Clients",
+            f"Merge {duplicate[1]} ({duplicate[0]}) into {keep[1]} ({keep[0]})?\n"
+            "Orders will be moved to the kept client and the duplicate deleted.")
+        if answer != QMessageBox.Yes:
+            return
+
+        if not self.db_manager.merge_clients(keep[0], [duplicate[0]]):
+            QMessageBox.critical(self, "Database Error", "Merging clients failed.")
+            return
+
+        # Drop every pair that referred to the merged-away client.
+        remaining = [candidate for candidate in self.candidates
+                     if duplicate[0] not in (candidate[1][0], candidate[2][0])]
+        self.show_candidates(remaining, self.skipped)
@@ -1,15 +1,42 @@
 import sys
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QPushButton, QHBoxLayout, QVBoxLayout, QStackedWidget, QLabel, QSizeGrip, QStatusBar
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from db_control import DatabaseManager
 import xml.etree.ElementTree as ET
 from styles import dark_style, light_style
 from gui import ClientWindow
 from temp_settings_gui import SettingsWindow
+from report_gui import ReportWindow
 from special_classes import CustomTitleBar
+from perf_monitor import PerformanceMonitor, instrumented
+from replication import CentralUnavailable
 import qdarkstyle
 
 
+class SyncThread(QThread):
+    """Runs one replication sync off the GUI thread."""
+    sync_finished = pyqtSignal(int, int)
+    sync_failed = pyqtSignal(str)
+
+    def __init__(self, sync_engine, parent=None):
+        super().__init__(parent)
+        self.sync_engine = sync_engine
+
+    def run(self):
+        try:
+            results = self.sync_engine.sync()
+        except CentralUnavailable as e:
+            self.sync_failed.emit(f"Central copy unavailable, working offline ({e})")
+            return
+        except Exception as e:
+            print(f"Error syncing databases: {str(e)}")
+            self.sync_failed.emit(f"Sync error: {str(e)}")
+            return
+        pushed = sum(result[0] for result in results.values())
+        pulled = sum(result[1] for result in results.values())
+        self.sync_finished.emit(pushed, pulled)
+
+
 class MainWindow(QMainWindow):
     """Main window of the application."""
     def __init__(self, db_manager):
@@ -23,7 +50,11 @@ class MainWindow(QMainWindow):
 
         self.setGeometry(100, 100, 800, 600)
         self.db_manager = db_manager
+        self.sync_thread = None
+        self.sync_timer = None
         self.setup_ui()
+        if self.db_manager.replication:
+            self.setup_sync()
 
     def setup_ui(self):
         """Setup the UI components."""
@@ -45,6 +76,11 @@ class MainWindow(QMainWindow):
         self.button1.clicked.connect(lambda: self.switch_page(0))
         sidebar_layout.addWidget(self.button1)
 
+        self.button3 = QPushButton("Reports")
+        self.button3.setMinimumHeight(25)
+        self.button3.clicked.connect(lambda: self.switch_page(2))
+        sidebar_layout.addWidget(self.button3)
+
         # Add stretch to push subsequent widgets to the bottom
         sidebar_layout.addStretch(50)
 
@@ -59,8 +95,10 @@ class MainWindow(QMainWindow):
         self.stacked_widget = QStackedWidget()
 
         # Example of adding pages to the stacked widget
-        self.stacked_widget.addWidget(ClientWindow(self.db_manager))  # Assuming ClientWindow is a QWidget
+        self.client_window = ClientWindow(self.db_manager)
+        self.stacked_widget.addWidget(self.client_window)  # Assuming ClientWindow is a QWidget
         self.stacked_widget.addWidget(SettingsWindow(self.db_manager))  # Assuming SettingsWindow is a QWidget
+        self.stacked_widget.addWidget(ReportWindow(self.db_manager))
 
         # Add sidebar and stacked widget to the main layout
         main_layout.addWidget(sidebar_widget)  # Sidebar
@@ -70,6 +108,27 @@ class MainWindow(QMainWindow):
         central_widget.setLayout(main_layout)
         self.setCentralWidget(central_widget)
 
+    def setup_sync(self):
+        """Periodically sync the local replica with the central copy."""
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(self.start_sync)
+        self.sync_timer.start(self.db_manager.replication['interval_s'] * 1000)
+        self.start_sync()
+
+    def start_sync(self):
+        if self.sync_thread is not None and self.sync_thread.isRunning():
+            return
+        self.sync_thread = SyncThread(self.db_manager.sync_engine(), self)
+        self.sync_thread.sync_finished.connect(self.sync_finished)
+        self.sync_thread.sync_failed.connect(lambda message: self.status_bar.showMessage(message))
+        self.sync_thread.start()
+
+    def sync_finished(self, pushed, pulled):
+        self.status_bar.showMessage(f"Synced: {pushed} sent, {pulled} received")
+        if pulled:
+            self.client_window.search_clients(self.client_window.search_bar.text())
+
+    @instrumented('MainWindow.switch_page')
     def switch_page(self, page_index):
         """Switch between pages in the stacked widget."""
         self.stacked_widget.setCurrentIndex(page_index)
@@ -85,6 +144,18 @@ def read_style_setting():
         return None  # Return None if the setting is not found
 
 
+def read_performance_settings():
+    """Read whether the performance monitor is enabled and its threshold in ms."""
+    try:
+        tree = ET.parse('settings.xml')
+        root = tree.getroot()
+        enabled = root.find('performance/monitor').text == "true"
+        threshold_ms = int(root.find('performance/threshold_ms').text)
+        return enabled, threshold_ms
+    except Exception:
+        return False, 200  # Monitoring stays off if the settings are missing
+
+
 def apply_style(app, style_name):
     """Apply the selected style to the application."""
     if style_name == "dark":
@@ -104,6 +175,13 @@ def main():
     db_manager = DatabaseManager()  # Database initialization now inside DatabaseManager
 
     mainWin = MainWindow(db_manager)
+
+    monitor_enabled, threshold_ms = read_performance_settings()
+    if monitor_enabled:
+        monitor = PerformanceMonitor(threshold_ms=threshold_ms, parent=app)
+        monitor.install(mainWin.status_bar)
+        app.aboutToQuit.connect(monitor.uninstall)
+
     mainWin.show()
 
     sys.exit(app.exec_())
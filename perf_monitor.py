@@ -0,0 +1,159 @@
+import functools
+import inspect
+import logging
+import sys
+import threading
+import time
+import traceback
+from logging.handlers import RotatingFileHandler
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWidgets import QLabel
+
+
+HEARTBEAT_INTERVAL_MS = 50
+OVERLAY_REFRESH_MS = 1000
+SUMMARY_INTERVAL_MS = 60000
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# The installed monitor; instrumented slots call straight through while it is None.
+_monitor = None
+
+
+def instrumented(name):
+    """Decorator recording duration and call count of a slot while a monitor is installed."""
+    def decorator(func):
+        parameters = inspect.signature(func).parameters.values()
+        if any(p.kind == p.VAR_POSITIONAL for p in parameters):
+            max_args = None
+        else:
+            max_args = sum(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parameters)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Qt passes every signal argument (e.g. clicked's 'checked'); drop the ones the slot does not take.
+            if max_args is not None:
+                args = args[:max_args]
+            monitor = _monitor
+            if monitor is None:
+                return func(*args, **kwargs)
+            return monitor.run_slot(name, func, args, kwargs)
+        return wrapper
+    return decorator
+
+
+class PerformanceMonitor(QObject):
+    """Measures event-loop lag and slot durations and logs stalls with a stack sample."""
+    def __init__(self, log_path='performance.log', threshold_ms=200, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000.0
+        self.logger = self.setup_logger(log_path)
+
+        self.slot_stats = {}
+        self.current_slot = None
+        self.slot_started = None
+        self.last_heartbeat = time.perf_counter()
+        self.current_lag = 0.0
+        self.max_lag = 0.0
+        self.stall_sampled = False
+        self.overlay = None
+
+        self.main_thread_id = threading.get_ident()
+        self.watchdog_stop = threading.Event()
+        self.watchdog = threading.Thread(target=self.watch, name="ui-watchdog", daemon=True)
+
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.timeout.connect(self.heartbeat)
+        self.overlay_timer = QTimer(self)
+        self.overlay_timer.timeout.connect(self.update_overlay)
+        self.summary_timer = QTimer(self)
+        self.summary_timer.timeout.connect(self.log_summary)
+
+    @staticmethod
+    def setup_logger(log_path):
+        logger = logging.getLogger('metrology.performance')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            handler = RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+            logger.addHandler(handler)
+        return logger
+
+    def install(self, status_bar=None):
+        """Start monitoring and route instrumented slots through this monitor."""
+        global _monitor
+        _monitor = self
+        if status_bar is not None:
+            self.overlay = QLabel("")
+            status_bar.addPermanentWidget(self.overlay)
+            self.overlay_timer.start(OVERLAY_REFRESH_MS)
+        self.last_heartbeat = time.perf_counter()
+        self.heartbeat_timer.start(HEARTBEAT_INTERVAL_MS)
+        self.summary_timer.start(SUMMARY_INTERVAL_MS)
+        self.watchdog.start()
+        self.logger.info("Performance monitor started (threshold %.0f ms)", self.threshold * 1000)
+
+    def uninstall(self):
+        """Stop monitoring and write a final summary."""
+        global _monitor
+        _monitor = None
+        self.heartbeat_timer.stop()
+        self.overlay_timer.stop()
+        self.summary_timer.stop()
+        self.watchdog_stop.set()
+        self.log_summary()
+
+    def heartbeat(self):
+        """Timer slot; any delay beyond the interval is time the event loop was blocked."""
+        now = time.perf_counter()
+        self.current_lag = max(0.0, now - self.last_heartbeat - HEARTBEAT_INTERVAL_MS / 1000.0)
+        self.max_lag = max(self.max_lag, self.current_lag)
+        if self.current_lag > self.threshold:
+            self.logger.warning("Event loop blocked for %.0f ms", self.current_lag * 1000)
+        self.last_heartbeat = now
+        self.stall_sampled = False
+
+    def run_slot(self, name, func, args, kwargs):
+        """Call an instrumented slot, recording its duration."""
+        outer_slot, outer_started = self.current_slot, self.slot_started
+        self.current_slot, self.slot_started = name, time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - self.slot_started
+            stats = self.slot_stats.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            if elapsed > self.threshold:
+                self.logger.warning("Slow slot %s took %.0f ms", name, elapsed * 1000)
+            self.current_slot, self.slot_started = outer_slot, outer_started
+
+    def watch(self):
+        """Watchdog thread: samples the GUI thread's stack once per stall."""
+        while not self.watchdog_stop.wait(self.threshold / 2):
+            stalled_for = time.perf_counter() - self.last_heartbeat
+            if stalled_for > self.threshold and not self.stall_sampled:
+                self.stall_sampled = True
+                frame = sys._current_frames().get(self.main_thread_id)
+                stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+                self.logger.warning("GUI thread stalled for %.0f ms in %s:\n%s",
+                                    stalled_for * 1000, self.current_slot or "unknown handler", stack)
+
+    def update_overlay(self):
+        if self.overlay is None:
+            return
+        text = f"Lag: {self.current_lag * 1000:.0f} ms (max {self.max_lag * 1000:.0f} ms)"
+        if self.slot_stats:
+            name, stats = max(self.slot_stats.items(), key=lambda item: item[1][2])
+            text += f" | Slowest: {name} {stats[2] * 1000:.0f} ms"
+        self.overlay.setText(text)
+
+    def log_summary(self):
+        """Write per-slot call counts and timings to the performance log."""
+        for name, (count, total, longest) in sorted(self.slot_stats.items()):
+            self.logger.info("%s: %d calls, avg %.1f ms, max %.1f ms",
+                             name, count, total / count * 1000, longest * 1000)
+        self.logger.info("Event loop max lag %.0f ms", self.max_lag * 1000)
@@ -0,0 +1,100 @@
+import re
+
+
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Key column used by the typed helpers for each table.
+TABLE_KEYS = {
+    'clients': 'client_id',
+}
+
+
+class QueryBuilder:
+    """Builds and caches SQL for one connection.
+
+    Table and column names are checked against the schema (read once per
+    table), and each statement is generated once per (kind, table, columns) with
+    columns in schema order, so identical saves always produce identical SQL and
+    hit sqlite3's statement cache.
+    """
+    def __init__(self, conn):
+        self.conn = conn
+        self.schema = {}
+        self.column_cache = {}
+        self.sql_cache = {}
+
+    def columns(self, table_name):
+        """Return {column: position} for a table, raising ValueError for unknown tables."""
+        columns = self.schema.get(table_name)
+        if columns is None:
+            if not IDENTIFIER_PATTERN.match(table_name):
+                raise ValueError(f"Invalid table name: {table_name!r}")
+            rows = self.conn.execute(f"PRAGMA table_info({table_name})").fetchall()
+            if not rows:
+                raise ValueError(f"Unknown table: {table_name}")
+            columns = self.schema[table_name] = {row[1]: row[0] for row in rows}
+        return columns
+
+    def ordered_columns(self, table_name, names):
+        """Validate column names and return them as a tuple in schema order."""
+        cache_key = (table_name, tuple(names))
+        ordered = self.column_cache.get(cache_key)
+        if ordered is None:
+            columns = self.columns(table_name)
+            unknown = [name for name in names if name not in columns]
+            if unknown:
+                raise ValueError(f"Unknown column(s) for {table_name}: {', '.join(map(str, unknown))}")
+            ordered = self.column_cache[cache_key] = tuple(sorted(names, key=columns.__getitem__))
+        return ordered
+
+    def sql(self, kind, table_name, columns, key_field=None):
+        cache_key = (kind, table_name, columns, key_field)
+        query = self.sql_cache.get(cache_key)
+        if query is None:
+            if key_field is not None:
+                self.ordered_columns(table_name, (key_field,))
+            column_list = ", ".join(columns)
+            if kind == 'insert':
+                placeholders = ", ".join(["?" for _ in columns])
+                query = f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})"
+            elif kind == 'update':
+                assignments = ", ".join(f"{column} = ?" for column in columns)
+                query = f"UPDATE {table_name} SET {assignments} WHERE {key_field} = ?"
+            elif kind == 'select':
+                query = f"SELECT {column_list or '*'} FROM {table_name} WHERE {key_field} = ?"
+            elif kind == 'exists':
+                query = f"SELECT 1 FROM {table_name} WHERE {key_field} = ? LIMIT 1"
+            elif kind == 'delete':
+                query = f"DELETE FROM {table_name} WHERE {key_field} = ?"
+            else:
+                raise ValueError(f"Unknown statement kind: {kind}")
+            self.sql_cache[cache_key] = query
+        return query
+
+    def insert(self, table_name, data):
+        """Return (sql, params) inserting data into table_name."""
+        columns = self.ordered_columns(table_name, data)
+        return self.sql('insert', table_name, columns), [data[column] for column in columns]
+
+    def update(self, table_name, key_field, data):
+        """Return (sql, params) updating the row whose key_field equals data[key_field]."""
+        columns = self.ordered_columns(table_name, [column for column in data if column != key_field])
+        params = [data[column] for column in columns]
+        params.append(data[key_field])
+        return self.sql('update', table_name, columns, key_field), params
+
+    def select(self, table_name, key_field, key, columns=()):
+        """Return (sql, params) selecting rows by key."""
+        columns = self.ordered_columns(table_name, columns)
+        return self.sql('select', table_name, columns, key_field), (key,)
+
+    def exists(self, table_name, key_field, key):
+        return self.sql('exists', table_name, (), key_field), (key,)
+
+    def delete(self, table_name, key_field, key):
+        return self.sql('delete', table_name, (), key_field), (key,)
+
+    # Typed helpers for the application's tables, keyed by TABLE_KEYS.
+
+    def select_client(self, client_id, columns=()):
+        return self.select('clients', TABLE_KEYS['clients'], client_id, columns)
@@ -0,0 +1,435 @@
+import os
+import sqlite3
+
+
+# Replicated tables per database and the column that identifies a row across stations.
+# Order and measurement ids are allocated by each station on its own, so those rows are
+# identified by a random uid filled in when the row is inserted.
+REPLICATED_TABLES = {
+    'Clients.db': {'clients': 'client_id'},
+    'Orders.db': {'orders': 'uid', 'measurements': 'uid'},
+}
+
+# Columns holding another replicated table's local id; they travel as that row's sync key.
+ROW_REFERENCES = {
+    'measurements': {'order_id': 'orders'},
+}
+
+NEW_UID = "lower(hex(randomblob(16)))"
+
+SYNC_BATCH_SIZE = 500
+CENTRAL_TIMEOUT = 5.0
+
+# UTC with milliseconds; together with the station name this orders competing writes.
+SYNC_TIMESTAMP = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+class CentralUnavailable(Exception):
+    """The central copy could not be reached."""
+
+
+def initialize_sync_tables(cursor):
+    """Create the per-row version table and sync bookkeeping table."""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS sync_rows
+                       (tbl TEXT, pk, seq INTEGER, changed_at TEXT, station TEXT, deleted INTEGER,
+                        PRIMARY KEY (tbl, pk))''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_sync_rows_seq ON sync_rows (seq)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS sync_meta (key TEXT PRIMARY KEY, value)''')
+    # References to rows that have not arrived yet, linked up when they do.
+    cursor.execute('''CREATE TABLE IF NOT EXISTS sync_refs
+                       (tbl TEXT, pk, col TEXT, ref_key, PRIMARY KEY (tbl, pk, col))''')
+
+
+def ensure_row_uids(cursor, table):
+    """Give every row of a uid-keyed table a uid, adding the column if needed."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if 'uid' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN uid TEXT")
+    cursor.execute(f"UPDATE {table} SET uid = {NEW_UID} WHERE uid IS NULL")
+    cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_uid ON {table} (uid)")
+
+
+def install_tracking(conn, db_name, station):
+    """Install change-tracking triggers on a local replica.
+
+    The first time a replica is tracked, every existing row is given a version
+    so that data created before replication was enabled is pushed as well.
+    """
+    cursor = conn.cursor()
+    initialize_sync_tables(cursor)
+    cursor.execute("SELECT value FROM sync_meta WHERE key = 'station'")
+    first_install = cursor.fetchone() is None
+    cursor.execute("INSERT OR REPLACE INTO sync_meta (key, value) VALUES ('station', ?)", (station,))
+
+    not_applying = "(SELECT value FROM sync_meta WHERE key = 'applying') IS NULL"
+    next_seq = "(SELECT COALESCE(MAX(seq), 0) + 1 FROM sync_rows)"
+    this_station = "(SELECT value FROM sync_meta WHERE key = 'station')"
+
+    def record(table, key, deleted):
+        return f"""INSERT INTO sync_rows (tbl, pk, seq, changed_at, station, deleted)
+                   VALUES ('{table}', {key}, {next_seq}, {SYNC_TIMESTAMP}, {this_station}, {deleted})
+                   ON CONFLICT (tbl, pk) DO UPDATE SET seq = excluded.seq, changed_at = excluded.changed_at,
+                       station = excluded.station, deleted = excluded.deleted;"""
+
+    for table, key_column in REPLICATED_TABLES[db_name].items():
+        for trigger in ('insert', 'update', 'rekey', 'delete'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS sync_{table}_{trigger}")
+        inserted_key = f'NEW.{key_column}'
+        fill_uid = ''
+        changed = not_applying
+        if key_column == 'uid':
+            ensure_row_uids(cursor, table)
+            inserted_key = f'(SELECT uid FROM {table} WHERE rowid = NEW.rowid)'
+            fill_uid = f"UPDATE {table} SET uid = {NEW_UID} WHERE rowid = NEW.rowid AND uid IS NULL;"
+            # Filling in the uid of a new row is recorded by the insert trigger.
+            changed += " AND OLD.uid IS NOT NULL"
+
+        cursor.execute(f"""CREATE TRIGGER sync_{table}_insert AFTER INSERT ON {table}
+                           WHEN {not_applying}
+                           BEGIN {fill_uid} {record(table, inserted_key, 0)} END""")
+        cursor.execute(f"""CREATE TRIGGER sync_{table}_update AFTER UPDATE ON {table}
+                           WHEN {changed}
+                           BEGIN {record(table, f'NEW.{key_column}', 0)} END""")
+        # A changed key means the row under the old key is gone.
+        cursor.execute(f"""CREATE TRIGGER sync_{table}_rekey AFTER UPDATE OF {key_column} ON {table}
+                           WHEN {not_applying} AND OLD.{key_column} IS NOT NULL
+                               AND OLD.{key_column} IS NOT NEW.{key_column}
+                           BEGIN {record(table, f'OLD.{key_column}', 1)} END""")
+        cursor.execute(f"""CREATE TRIGGER sync_{table}_delete AFTER DELETE ON {table}
+                           WHEN {not_applying}
+                           BEGIN {record(table, f'OLD.{key_column}', 1)} END""")
+
+        if first_install:
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM sync_rows")
+            last_seq = cursor.fetchone()[0]
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO sync_rows (tbl, pk, seq, changed_at, station, deleted)
+                SELECT '{table}', {key_column}, NULL, {SYNC_TIMESTAMP}, ?, 0 FROM {table}
+            """, (station,))
+            cursor.execute("UPDATE sync_rows SET seq = ? + rowid WHERE seq IS NULL", (last_seq,))
+    conn.commit()
+
+
+class SyncEngine:
+    """Exchanges row-level changes between local replicas and a central copy.
+
+    Each replicated row carries a version (changed_at, station) in sync_rows; the
+    later version wins. Changes are pushed and pulled in batches, each batch in
+    one transaction, and sync_meta remembers how far each direction got.
+    """
+    def __init__(self, local_folder, central_folder, station, db_names=None):
+        self.local_folder = local_folder
+        self.central_folder = central_folder
+        self.station = station
+        self.db_names = db_names or list(REPLICATED_TABLES)
+
+    def central_available(self):
+        return bool(self.central_folder) and os.path.isdir(self.central_folder)
+
+    def bootstrap(self):
+        """Seed missing local replicas from the central copy.
+
+        A missing central copy is created from the replica of the first station
+        that syncs, see seed_central.
+        """
+        if not self.central_available():
+            return
+        for db_name in self.db_names:
+            local_path = os.path.join(self.local_folder, db_name)
+            central_path = os.path.join(self.central_folder, db_name)
+            try:
+                if not os.path.exists(local_path) and os.path.exists(central_path):
+                    # A central copy made from a pre-replication shared folder has no uids yet;
+                    # they are assigned there first, so every station copies the same ones.
+                    central = sqlite3.connect(central_path, timeout=CENTRAL_TIMEOUT)
+                    try:
+                        self.ensure_central_uids(central, db_name)
+                    finally:
+                        central.close()
+                    self.copy_database(central_path, local_path)
+                    local = sqlite3.connect(local_path)
+                    try:
+                        # The copy already contains everything up to the central's latest change.
+                        initialize_sync_tables(local.cursor())
+                        local.execute("DELETE FROM sync_meta WHERE key IN ('station', 'pushed_seq', 'pulled_seq')")
+                        local.execute("""INSERT INTO sync_meta (key, value)
+                                         SELECT 'pulled_seq', COALESCE(MAX(seq), 0) FROM sync_rows""")
+                        local.execute("""INSERT INTO sync_meta (key, value)
+                                         SELECT 'pushed_seq', COALESCE(MAX(seq), 0) FROM sync_rows""")
+                        local.commit()
+                    finally:
+                        local.close()
+            except (sqlite3.Error, OSError) as e:
+                print(f"Error seeding replica {db_name}: {str(e)}")
+
+    def seed_central(self, local_path, central_path):
+        """Create the central copy from this station's replica.
+
+        The whole file is copied, so the clients journal and snapshots reach every
+        station bootstrapped from it. This station's change tracking is removed;
+        the central copy is only written by the sync engine.
+        """
+        partial_path = central_path + '.partial'
+        self.copy_database(local_path, partial_path)
+        central = sqlite3.connect(partial_path)
+        try:
+            triggers = central.execute("""SELECT name FROM sqlite_master
+                                          WHERE type = 'trigger' AND name LIKE 'sync!_%' ESCAPE '!'""").fetchall()
+            for (name,) in triggers:
+                central.execute(f"DROP TRIGGER {name}")
+            central.execute("DELETE FROM sync_meta")
+            central.commit()
+        finally:
+            central.close()
+        os.replace(partial_path, central_path)
+
+    @staticmethod
+    def copy_database(source_path, target_path):
+        source = sqlite3.connect(source_path, timeout=CENTRAL_TIMEOUT)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+
+    def sync(self):
+        """Push local changes then pull remote ones. Returns {db_name: (pushed, pulled)}.
+
+        Raises CentralUnavailable when the central copy cannot be reached; local
+        work continues and the changes are sent on the next successful sync.
+        """
+        if not self.central_available():
+            raise CentralUnavailable(self.central_folder)
+
+        results = {}
+        for db_name in self.db_names:
+            local_path = os.path.join(self.local_folder, db_name)
+            central_path = os.path.join(self.central_folder, db_name)
+            local = sqlite3.connect(local_path, timeout=CENTRAL_TIMEOUT, isolation_level=None)
+            try:
+                try:
+                    if not os.path.exists(central_path):
+                        self.seed_central(local_path, central_path)
+                    central = sqlite3.connect(central_path, timeout=CENTRAL_TIMEOUT, isolation_level=None)
+                    self.prepare_central(central, local, db_name)
+                except (sqlite3.Error, OSError) as e:
+                    raise CentralUnavailable(str(e))
+                try:
+                    pushed = self.push(local, central, db_name)
+                    pulled = self.pull(local, central, db_name)
+                    results[db_name] = (pushed, pulled)
+                finally:
+                    central.close()
+            finally:
+                local.close()
+        return results
+
+    def prepare_central(self, central, local, db_name):
+        """Make sure the central copy has the replicated tables and sync tables."""
+        cursor = central.cursor()
+        for table in REPLICATED_TABLES[db_name]:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            if cursor.fetchone() is None:
+                schema = local.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                       (table,)).fetchone()
+                if schema is not None:
+                    cursor.execute(schema[0])
+        self.ensure_central_uids(central, db_name)
+        initialize_sync_tables(cursor)
+
+    @staticmethod
+    def ensure_central_uids(central, db_name):
+        """Give the central copy's rows of uid-keyed tables their uids."""
+        cursor = central.cursor()
+        for table, key_column in REPLICATED_TABLES[db_name].items():
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            if key_column == 'uid' and cursor.fetchone() is not None:
+                ensure_row_uids(cursor, table)
+        if central.in_transaction:
+            central.commit()
+
+    @staticmethod
+    def get_meta(conn, key, default=None):
+        row = conn.execute("SELECT value FROM sync_meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    @staticmethod
+    def set_meta(conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO sync_meta (key, value) VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def copied_columns(conn, table, key_column):
+        """Columns to copy between copies; local rowid aliases other than the sync key are left out."""
+        return [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()
+                if not row[5] or row[1] == key_column]
+
+    @staticmethod
+    def exported_column(db_name, table, column):
+        """SQL reading a column for another copy; references become the referenced row's sync key."""
+        referenced = ROW_REFERENCES.get(table, {}).get(column)
+        if referenced is None:
+            return column
+        key_column = REPLICATED_TABLES[db_name][referenced]
+        return f"(SELECT {key_column} FROM {referenced} WHERE rowid = {table}.{column})"
+
+    @staticmethod
+    def imported_value(db_name, table, column):
+        """SQL placeholder turning an exported value back into this copy's column value."""
+        referenced = ROW_REFERENCES.get(table, {}).get(column)
+        if referenced is None:
+            return "?"
+        key_column = REPLICATED_TABLES[db_name][referenced]
+        return f"(SELECT rowid FROM {referenced} WHERE {key_column} = ?)"
+
+    def read_changes(self, source, db_name, changes):
+        """Read the source rows for a batch of (tbl, pk, seq, changed_at, station, deleted) changes.
+
+        Returns (table, key_column, key, changed_at, station, deleted, values) tuples,
+        values being {column: value} or None for deleted rows.
+        """
+        prepared = []
+        exported_columns = {}
+        for table, key, _, changed_at, station, deleted in changes:
+            key_column = REPLICATED_TABLES[db_name].get(table)
+            if key_column is None:
+                continue
+            values = None
+            if not deleted:
+                columns = exported_columns.get(table)
+                if columns is None:
+                    columns = exported_columns[table] = self.copied_columns(source, table, key_column)
+                exported = ", ".join(self.exported_column(db_name, table, column) for column in columns)
+                row = source.execute(f"SELECT {exported} FROM {table} WHERE {key_column} = ?", (key,)).fetchone()
+                if row is not None:
+                    values = dict(zip(columns, row))
+            prepared.append((table, key_column, key, changed_at, station, deleted, values))
+        return prepared
+
+    def apply_change(self, target, db_name, table, key_column, columns, key, deleted, values):
+        """Bring the target's row for key in line with the values read from the source.
+
+        Existing rows are updated in place, so triggers on the target (the clients
+        journal) record an update rather than a delete followed by an insert.
+        """
+        if deleted:
+            target.execute(f"DELETE FROM {table} WHERE {key_column} = ?", (key,))
+            target.execute("DELETE FROM sync_refs WHERE tbl = ? AND pk = ?", (table, key))
+            return
+        if values is None:
+            # Deleted since this version was recorded; the deletion follows in a later change.
+            return
+        columns = [column for column in columns if column in values]
+        row = [values[column] for column in columns]
+        assignments = ", ".join(f"{column} = {self.imported_value(db_name, table, column)}" for column in columns)
+        cursor = target.execute(f"UPDATE {table} SET {assignments} WHERE {key_column} = ?", (*row, key))
+        if cursor.rowcount == 0:
+            column_list = ", ".join(columns)
+            placeholders = ", ".join(self.imported_value(db_name, table, column) for column in columns)
+            target.execute(f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})", row)
+        self.link_references(target, db_name, table, key_column, key, values)
+
+    def link_references(self, conn, db_name, table, key_column, key, values):
+        """Remember this row's unresolved references and resolve the ones waiting for this row."""
+        conn.execute("DELETE FROM sync_refs WHERE tbl = ? AND pk = ?", (table, key))
+        for column in ROW_REFERENCES.get(table, {}):
+            if values.get(column) is None:
+                continue
+            row = conn.execute(f"SELECT {column} FROM {table} WHERE {key_column} = ?", (key,)).fetchone()
+            if row[0] is None:
+                conn.execute("INSERT INTO sync_refs (tbl, pk, col, ref_key) VALUES (?, ?, ?, ?)",
+                             (table, key, column, values[column]))
+
+        for referencing, references in ROW_REFERENCES.items():
+            for column, referenced in references.items():
+                if referenced != table:
+                    continue
+                referencing_key = REPLICATED_TABLES[db_name][referencing]
+                conn.execute(f"""
+                    UPDATE {referencing} SET {column} = (SELECT rowid FROM {table} WHERE {key_column} = ?)
+                    WHERE {referencing_key} IN (SELECT pk FROM sync_refs WHERE tbl = ? AND col = ? AND ref_key = ?)
+                """, (key, referencing, column, key))
+                conn.execute("DELETE FROM sync_refs WHERE tbl = ? AND col = ? AND ref_key = ?",
+                             (referencing, column, key))
+
+    def is_newer(self, conn, table, key, changed_at, station):
+        row = conn.execute("SELECT changed_at, station FROM sync_rows WHERE tbl = ? AND pk = ?",
+                           (table, key)).fetchone()
+        return row is None or (changed_at, station) > (row[0], row[1] or "")
+
+    def apply_changes(self, target, db_name, prepared, target_marks_applying):
+        """Apply a batch returned by read_changes to target; returns rows applied.
+
+        The source rows are read beforehand, so the write transaction left open
+        for the caller to commit never waits on the other copy (the central one
+        being on a network share).
+        """
+        target_columns = {}
+        applied = 0
+        target.execute("BEGIN IMMEDIATE")
+        try:
+            if target_marks_applying:
+                self.set_meta(target, 'applying', 1)
+            for table, key_column, key, changed_at, station, deleted, values in prepared:
+                if not self.is_newer(target, table, key, changed_at, station):
+                    continue
+                columns = target_columns.get(table)
+                if columns is None:
+                    columns = target_columns[table] = self.copied_columns(target, table, key_column)
+                self.apply_change(target, db_name, table, key_column, columns, key, deleted, values)
+                target.execute("""
+                    INSERT INTO sync_rows (tbl, pk, seq, changed_at, station, deleted)
+                    VALUES (?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM sync_rows), ?, ?, ?)
+                    ON CONFLICT (tbl, pk) DO UPDATE SET seq = excluded.seq, changed_at = excluded.changed_at,
+                        station = excluded.station, deleted = excluded.deleted
+                """, (table, key, changed_at, station, deleted))
+                applied += 1
+            if target_marks_applying:
+                target.execute("DELETE FROM sync_meta WHERE key = 'applying'")
+        except sqlite3.Error:
+            target.execute("ROLLBACK")
+            raise
+        return applied
+
+    def push(self, local, central, db_name):
+        """Send this station's changes to the central copy.
+
+        Errors from the central copy raise CentralUnavailable; errors from the
+        local replica, such as a lock held by the GUI, propagate unchanged.
+        """
+        pushed = 0
+        while True:
+            pushed_seq = self.get_meta(local, 'pushed_seq', 0)
+            changes = local.execute("""
+                SELECT tbl, pk, seq, changed_at, station, deleted FROM sync_rows
+                WHERE seq > ? AND station = ? ORDER BY seq LIMIT ?
+            """, (pushed_seq, self.station, SYNC_BATCH_SIZE)).fetchall()
+            if not changes:
+                return pushed
+            prepared = self.read_changes(local, db_name, changes)
+            try:
+                pushed += self.apply_changes(central, db_name, prepared, target_marks_applying=False)
+                central.execute("COMMIT")
+            except sqlite3.OperationalError as e:
+                raise CentralUnavailable(str(e))
+            self.set_meta(local, 'pushed_seq', changes[-1][2])
+
+    def pull(self, local, central, db_name):
+        """Fetch other stations' changes from the central copy; errors are reported as in push."""
+        pulled = 0
+        while True:
+            pulled_seq = self.get_meta(local, 'pulled_seq', 0)
+            try:
+                changes = central.execute("""
+                    SELECT tbl, pk, seq, changed_at, station, deleted FROM sync_rows
+                    WHERE seq > ? ORDER BY seq LIMIT ?
+                """, (pulled_seq, SYNC_BATCH_SIZE)).fetchall()
+                remote = [change for change in changes if change[4] != self.station]
+                prepared = self.read_changes(central, db_name, remote)
+            except sqlite3.OperationalError as e:
+                raise CentralUnavailable(str(e))
+            if not changes:
+                return pulled
+            pulled += self.apply_changes(local, db_name, prepared, target_marks_applying=True)
+            self.set_meta(local, 'pulled_seq', changes[-1][2])
+            local.execute("COMMIT")
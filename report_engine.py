@@ -0,0 +1,223 @@
+import html
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+
+
+# Orders for the same client are handed to a worker together so its cached
+# client header is reused; chunks are capped to keep progress updates flowing.
+MAX_ORDERS_PER_TASK = 20
+
+REPORT_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Certificate of Conformance - Order $order_id</title>
+<style>
+    body { font-family: Arial, sans-serif; font-size: 10pt; }
+    table { border-collapse: collapse; width: 100%; }
+    th, td { border: 1px solid #444; padding: 3px 6px; text-align: left; }
+    .fail { color: #b00000; font-weight: bold; }
+</style>
+</head>
+<body>
+$client_header
+<h2>Certificate of Conformance</h2>
+<p>Order: $order_id<br>Generated: $generated</p>
+<table>
+<tr><th>Feature</th><th>Nominal</th><th>Tol +</th><th>Tol -</th><th>Measured</th><th>Result</th></tr>
+$measurement_rows
+</table>
+<p>Result: <b>$overall</b></p>
+</body>
+</html>
+""")
+
+CLIENT_HEADER_TEMPLATE = Template("""<div class="client">
+<h1>$client_name</h1>
+<p>$client_address1<br>$client_address2<br>Phone: $client_phone<br>Email/Fax: $client_emailfax</p>
+</div>""")
+
+MEASUREMENT_ROW_TEMPLATE = Template(
+    "<tr><td>$feature</td><td>$nominal</td><td>$tolerance_plus</td><td>$tolerance_minus</td>"
+    "<td>$measured</td><td$css>$result</td></tr>")
+
+# Per-process state, populated by init_worker in each pool process; orders files
+# (Orders.db and its archives) are added by path as the worker first needs them.
+_worker_connections = {}
+
+
+def open_read_only(db_path):
+    """Open an SQLite database in read-only mode."""
+    uri = Path(os.path.abspath(db_path)).as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+
+def init_worker(db_folder):
+    """Open the read-only connections used by a report worker process."""
+    _worker_connections['Clients.db'] = open_read_only(os.path.join(db_folder, 'Clients.db'))
+
+
+def orders_connection(orders_path):
+    """Return this worker's read-only connection to Orders.db or one of its archive files."""
+    conn = _worker_connections.get(orders_path)
+    if conn is None:
+        conn = _worker_connections[orders_path] = open_read_only(orders_path)
+    return conn
+
+
+@lru_cache(maxsize=256)
+def render_client_header(client_id):
+    """Render the client header block, cached per worker process."""
+    cursor = _worker_connections['Clients.db'].cursor()
+    cursor.execute("""
+        SELECT client_name, client_address1, client_address2, client_phone, client_emailfax
+        FROM clients
+        WHERE client_id = ?
+    """, (client_id,))
+    row = cursor.fetchone() or ("Unknown client", "", "", "", "")
+    keys = ('client_name', 'client_address1', 'client_address2', 'client_phone', 'client_emailfax')
+    return CLIENT_HEADER_TEMPLATE.substitute({k: html.escape(str(v or "")) for k, v in zip(keys, row)})
+
+
+def is_in_tolerance(nominal, tolerance_plus, tolerance_minus, measured):
+    """Check whether a measured value lies inside its tolerance band, limits included.
+
+    Values are compared as the decimals they were entered as, so a reading
+    exactly on a limit passes even when the binary float sum is off by an ulp.
+    """
+    if None in (nominal, measured):
+        return False
+    nominal = Decimal(str(nominal))
+    upper = nominal + abs(Decimal(str(tolerance_plus or 0.0)))
+    lower = nominal - abs(Decimal(str(tolerance_minus or 0.0)))
+    return lower <= Decimal(str(measured)) <= upper
+
+
+def render_order(orders_path, order_id, client_id):
+    """Render the full HTML report for a single order stored in orders_path."""
+    cursor = orders_connection(orders_path).cursor()
+    cursor.execute("""
+        SELECT feature, nominal, tolerance_plus, tolerance_minus, measured
+        FROM measurements
+        WHERE order_id = ?
+        ORDER BY id
+    """, (order_id,))
+
+    rows = []
+    all_pass = True
+    for feature, nominal, tol_plus, tol_minus, measured in cursor.fetchall():
+        passed = is_in_tolerance(nominal, tol_plus, tol_minus, measured)
+        all_pass = all_pass and passed
+        rows.append(MEASUREMENT_ROW_TEMPLATE.substitute(
+            feature=html.escape(str(feature or "")),
+            nominal="" if nominal is None else nominal,
+            tolerance_plus="" if tol_plus is None else tol_plus,
+            tolerance_minus="" if tol_minus is None else tol_minus,
+            measured="" if measured is None else measured,
+            css="" if passed else ' class="fail"',
+            result="PASS" if passed else "FAIL",
+        ))
+
+    return REPORT_TEMPLATE.substitute(
+        order_id=order_id,
+        client_header=render_client_header(client_id),
+        generated=time.strftime("%Y-%m-%d %H:%M"),
+        measurement_rows="\n".join(rows),
+        overall="CONFORMING" if all_pass and rows else "NON-CONFORMING",
+    )
+
+
+def generate_reports(orders_path, orders, output_dir):
+    """Worker task: render and write reports for a chunk of (order_id, client_id) pairs from one orders file."""
+    results = []
+    for order_id, client_id in orders:
+        start = time.perf_counter()
+        path = os.path.join(output_dir, f"CoC_{order_id}.html")
+        try:
+            report = render_order(orders_path, order_id, client_id)
+            with open(path, 'w', encoding='utf-8') as report_file:
+                report_file.write(report)
+            error = None
+        except (sqlite3.Error, OSError) as e:
+            path = None
+            error = str(e)
+        results.append((order_id, path, time.perf_counter() - start, error))
+    return results
+
+
+class ReportEngine:
+    """Generates inspection reports for orders in a pool of worker processes.
+
+    archive_paths lists the order archive files to include besides Orders.db,
+    see DatabaseManager.list_archive_partitions.
+    """
+    def __init__(self, db_folder, max_workers=None, archive_paths=()):
+        self.db_folder = db_folder
+        self.max_workers = max_workers
+        self.archive_paths = list(archive_paths)
+
+    def plan_tasks(self, order_ids=None):
+        """Return (orders_path, orders) chunks, grouped by client so client headers are rendered once per worker."""
+        wanted = None if order_ids is None else set(order_ids)
+        tasks = []
+        for orders_path in [os.path.join(self.db_folder, 'Orders.db')] + self.archive_paths:
+            conn = open_read_only(orders_path)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, client_id FROM orders ORDER BY client_id, id")
+                orders = cursor.fetchall()
+            finally:
+                conn.close()
+
+            current_client = object()
+            for order in orders:
+                if wanted is not None and order[0] not in wanted:
+                    continue
+                if order[1] != current_client or len(tasks[-1][1]) >= MAX_ORDERS_PER_TASK:
+                    tasks.append((orders_path, []))
+                    current_client = order[1]
+                tasks[-1][1].append(order)
+        return tasks
+
+    def run(self, output_dir, order_ids=None, progress_callback=None, cancelled=None):
+        """Generate reports and return a list of (order_id, path, seconds, error) tuples.
+
+        progress_callback(done, total, result) is called in the calling thread as each
+        report finishes; cancelled() is polled to stop submitting further results.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        tasks = self.plan_tasks(order_ids)
+        total = sum(len(orders) for _, orders in tasks)
+        results = []
+        if not tasks:
+            return results
+
+        # Spawn rather than fork: the caller is a thread inside a running Qt application.
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                 initializer=init_worker, initargs=(self.db_folder,)) as executor:
+            futures = {executor.submit(generate_reports, orders_path, orders, output_dir): orders
+                       for orders_path, orders in tasks}
+            for future in as_completed(futures):
+                if cancelled is not None and cancelled():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                try:
+                    chunk_results = future.result()
+                except Exception as e:
+                    # A chunk that fails outright (bad data, a crashed worker) costs only its own orders.
+                    error = f"{type(e).__name__}: {e}"
+                    chunk_results = [(order_id, None, 0.0, error) for order_id, _ in futures[future]]
+                for result in chunk_results:
+                    results.append(result)
+                    if progress_callback is not None:
+                        progress_callback(len(results), total, result)
+        return results
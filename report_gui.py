@@ -0,0 +1,167 @@
+import os
+import time
+
+from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                             QPushButton, QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView,
+                             QMessageBox)
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from report_engine import ReportEngine
+
+
+class ReportThread(QThread):
+    """Runs the report engine off the GUI thread and relays its progress."""
+    progress = pyqtSignal(int, int)
+    report_finished = pyqtSignal(int, str, float, str)
+    generation_finished = pyqtSignal(int, float)
+
+    def __init__(self, db_folder, output_dir, order_ids=None, archive_paths=(), parent=None):
+        super().__init__(parent)
+        self.engine = ReportEngine(db_folder, archive_paths=archive_paths)
+        self.output_dir = output_dir
+        self.order_ids = order_ids
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            results = self.engine.run(self.output_dir, self.order_ids,
+                                      progress_callback=self.on_progress,
+                                      cancelled=self.isInterruptionRequested)
+        except Exception as e:
+            print(f"Error generating reports: {str(e)}")
+            results = []
+        self.generation_finished.emit(len(results), time.perf_counter() - start)
+
+    def on_progress(self, done, total, result):
+        order_id, path, seconds, error = result
+        self.report_finished.emit(order_id, path or "", seconds, error or "")
+        self.progress.emit(done, total)
+
+
+class ReportWindow(QMainWindow):
+    def __init__(self, db_manager):
+        super().__init__()
+        self.db_manager = db_manager
+
+        # Initialize all instance attributes
+        self.output_entry = None
+        self.generate_button = None
+        self.cancel_button = None
+        self.progress_bar = None
+        self.status_label = None
+        self.results_table = None
+        self.report_thread = None
+
+        self.initializeUI()
+
+    def initializeUI(self):
+        """Initializes the main UI components of the window."""
+        self.setWindowTitle("Reports")
+        self.setGeometry(100, 100, 800, 500)
+        central_widget = QWidget(self)
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+        self.setupOutputSetting(main_layout)
+        self.setupButtons(main_layout)
+        self.setupProgress(main_layout)
+        self.setupResultsTable(main_layout)
+
+    def setupOutputSetting(self, layout):
+        """Sets up the output folder setting in the UI."""
+        output_layout = QHBoxLayout()
+        label = QLabel("Output Folder:")
+        label.setFont(QFont("Arial", 10, QFont.Bold))
+        self.output_entry = QLineEdit(os.path.join(self.db_manager.db_folder, "Reports"))
+        output_layout.addWidget(label)
+        output_layout.addWidget(self.output_entry)
+        layout.addLayout(output_layout)
+
+    def setupButtons(self, layout):
+        """Sets up buttons in the UI."""
+        button_layout = QHBoxLayout()
+        layout.addLayout(button_layout)
+
+        font = QFont("Arial", 12)
+
+        self.generate_button = QPushButton("Generate All Reports")
+        self.cancel_button = QPushButton("Cancel")
+        self.generate_button.setFont(font)
+        self.cancel_button.setFont(font)
+        self.cancel_button.setEnabled(False)
+
+        button_layout.addWidget(self.generate_button)
+        button_layout.addWidget(self.cancel_button)
+
+        self.generate_button.clicked.connect(self.generate_reports)
+        self.cancel_button.clicked.connect(self.cancel_reports)
+
+    def setupProgress(self, layout):
+        """Sets up the progress bar and status label."""
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        self.status_label = QLabel("")
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.status_label)
+
+    def setupResultsTable(self, layout):
+        """Sets up the per-report timing table."""
+        self.results_table = QTableWidget()
+        self.results_table.setAlternatingRowColors(True)
+        self.results_table.setColumnCount(4)
+        self.results_table.setHorizontalHeaderLabels(["Order", "Time (ms)", "File", "Error"])
+        self.results_table.setEditTriggers(QTableWidget.NoEditTriggers)
+
+        header = self.results_table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Interactive)
+        header.setSectionResizeMode(1, QHeaderView.Interactive)
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
+        header.setSectionResizeMode(3, QHeaderView.Stretch)
+
+        layout.addWidget(self.results_table)
+
+    def generate_reports(self):
+        """Starts generating reports for all orders in a background thread."""
+        if self.report_thread is not None and self.report_thread.isRunning():
+            return
+
+        self.results_table.setRowCount(0)
+        self.progress_bar.setValue(0)
+        self.status_label.setText("Generating reports...")
+        self.generate_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+
+        # Archived orders are included so they can still be certified.
+        archive_paths = [os.path.join(self.db_manager.archive_folder, file_name)
+                         for file_name, _, _ in self.db_manager.list_archive_partitions()]
+        self.report_thread = ReportThread(self.db_manager.db_folder, self.output_entry.text(),
+                                          archive_paths=archive_paths, parent=self)
+        self.report_thread.progress.connect(self.update_progress)
+        self.report_thread.report_finished.connect(self.add_result)
+        self.report_thread.generation_finished.connect(self.generation_finished)
+        self.report_thread.start()
+
+    def cancel_reports(self):
+        """Requests the running generation to stop."""
+        if self.report_thread is not None:
+            self.report_thread.requestInterruption()
+            self.status_label.setText("Cancelling...")
+
+    def update_progress(self, done, total):
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(done)
+
+    def add_result(self, order_id, path, seconds, error):
+        row = self.results_table.rowCount()
+        self.results_table.insertRow(row)
+        for column, value in enumerate([str(order_id), f"{seconds * 1000:.1f}", path, error]):
+            self.results_table.setItem(row, column, QTableWidgetItem(value))
+
+    def generation_finished(self, count, seconds):
+        self.generate_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        if count:
+            self.status_label.setText(f"Generated {count} reports in {seconds:.1f} s.")
+        else:
+            self.status_label.setText("")
+            QMessageBox.information(self, "Information", "No reports were generated.")
@@ -0,0 +1,63 @@
+from array import array
+
+
+FETCH_BATCH_SIZE = 1000
+
+
+class ResultSet:
+    """Column-oriented query result.
+
+    Integer columns are packed into array('q'); other columns are lists whose
+    strings are interned through a per-result pool, so repeated values such as
+    cities or street names are stored once. Rows are read from the cursor in
+    batches and never held as tuples.
+    """
+    __slots__ = ('column_names', 'columns', 'row_count')
+
+    def __init__(self, column_names):
+        self.column_names = column_names
+        self.columns = [array('q') for _ in column_names]
+        self.row_count = 0
+
+    @classmethod
+    def from_cursor(cls, cursor, batch_size=FETCH_BATCH_SIZE):
+        """Build a result set from an executed cursor."""
+        result = cls([description[0] for description in cursor.description or ()])
+        string_pool = {}
+        columns = result.columns
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                for index, value in enumerate(row):
+                    column = columns[index]
+                    if type(column) is array:
+                        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+                            column.append(value)
+                            continue
+                        # First non-integer value: fall back to a plain list for this column.
+                        column = columns[index] = list(column)
+                    if type(value) is str:
+                        value = string_pool.setdefault(value, value)
+                    column.append(value)
+            result.row_count += len(rows)
+        return result
+
+    def __len__(self):
+        return self.row_count
+
+    def __bool__(self):
+        return self.row_count > 0
+
+    def __getitem__(self, row):
+        return tuple(column[row] for column in self.columns)
+
+    def __iter__(self):
+        return zip(*self.columns)
+
+    def value(self, row, column):
+        return self.columns[column][row]
+
+    def column(self, column):
+        return self.columns[column]
@@ -10,22 +10,22 @@ def dark_style():
        QListWidget {
            alternate-background-color: #505050;
        }
-       QTableWidget {
+       QTableView {
            background-color: #60798B;
        }
-       QTableWidget::item {
+       QTableView::item {
            background-color: #9DA9B5; 
        }
-       QTableWidget::item:alternate {
+       QTableView::item:alternate {
            background-color: #7D8B9C;
        }
-       QTableWidget::item:selected {
+       QTableView::item:selected {
            background-color: #506070;
        }
-       QTableWidget QHeaderView::section {
+       QTableView QHeaderView::section {
            background-color: #60798B;
        }
-       QTableWidget QTableCornerButton::section {
+       QTableView QTableCornerButton::section {
            background-color: #60798B;
        }
        """
@@ -1,4 +1,4 @@
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
+from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QApplication
 import xml.etree.ElementTree as ET
 import qdarkstyle
 from styles import dark_style, light_style
@@ -26,6 +26,7 @@ class SettingsWindow(QMainWindow):
         self.setupDatabasePathSetting(layout)
         self.setupStyleSelectionSetting(layout)
         self.setupSaveButton(layout)
+        self.setupArchiveButton(layout)
         self.load_settings()
 
     def setupDatabasePathSetting(self, layout):
@@ -52,6 +53,27 @@ class SettingsWindow(QMainWindow):
         self.save_button.clicked.connect(self.save_settings)
         layout.addWidget(self.save_button)
 
+    def setupArchiveButton(self, layout):
+        """Sets up the button that archives closed orders from previous periods."""
+        self.archive_button = QPushButton("Archive Closed Orders")
+        self.archive_button.clicked.connect(self.archive_orders)
+        if self.db_manager.replication:
+            # Archiving deletes rows, which would replicate as deletions to every station.
+            self.archive_button.setEnabled(False)
+            self.archive_button.setToolTip("Archiving is not available in replication mode.")
+        layout.addWidget(self.archive_button)
+
+    def archive_orders(self):
+        """Move closed orders from earlier periods into the archive databases."""
+        self.archive_button.setEnabled(False)
+        try:
+            # Each batch commits separately; keep the window responsive between batches.
+            moved = self.db_manager.archive_closed_orders(
+                progress_callback=lambda count: QApplication.processEvents())
+            QMessageBox.information(self, "Success", f"Archived {moved} closed orders.")
+        finally:
+            self.archive_button.setEnabled(not self.db_manager.replication)
+
     def load_settings(self):
         """Load settings from the XML file and update the UI."""
         try:
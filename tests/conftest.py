@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+SETTINGS_XML = """<?xml version="1.0"?>
+<settings>
+    <database>
+        <path>Database</path>
+        <archive_period>{archive_period}</archive_period>
+    </database>
+    <style>
+        <selection>dark</selection>
+    </style>
+</settings>
+"""
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def make_db_manager(qapp, tmp_path, monkeypatch):
+    """Build DatabaseManagers on a fresh Database folder under tmp_path."""
+    from db_control import DatabaseManager
+    monkeypatch.chdir(tmp_path)
+    managers = []
+
+    def make(archive_period='year'):
+        (tmp_path / 'settings.xml').write_text(SETTINGS_XML.format(archive_period=archive_period))
+        manager = DatabaseManager()
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        for conn in manager.connections.values():
+            conn.close()
+
+
+@pytest.fixture
+def db_manager(make_db_manager):
+    return make_db_manager()
@@ -0,0 +1,34 @@
+import sqlite3
+
+import client_dedup
+from client_dedup import find_duplicate_candidates, rebuild_blocking_keys
+
+
+def make_clients(rows):
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE clients (client_id INTEGER, client_name TEXT, client_phone TEXT)")
+    conn.execute("CREATE TABLE client_keys (client_id INTEGER, key_type TEXT, block_key TEXT)")
+    conn.executemany("INSERT INTO clients VALUES (?, ?, NULL)", rows)
+    rebuild_blocking_keys(conn)
+    return conn
+
+
+def test_oversized_block_is_split_on_longer_prefix(monkeypatch):
+    monkeypatch.setattr(client_dedup, 'MAX_BLOCK_SIZE', 3)
+    conn = make_clients([(1, 'Precision Gear Co'), (2, 'Precision Gears Inc'), (3, 'Precise Tooling'),
+                         (4, 'Precast Concrete'), (5, 'Prestige Motors')])
+
+    candidates, skipped = find_duplicate_candidates(conn)
+
+    assert [(a[0], b[0]) for _, a, b in candidates] == [(1, 2)]
+    assert skipped == []
+
+
+def test_block_that_cannot_be_split_is_reported(monkeypatch):
+    monkeypatch.setattr(client_dedup, 'MAX_BLOCK_SIZE', 2)
+    conn = make_clients([(1, 'Acme'), (2, 'Acme'), (3, 'Acme Corp')])
+
+    candidates, skipped = find_duplicate_candidates(conn)
+
+    assert candidates == []
+    assert skipped == [('name', 'acme', 3)]
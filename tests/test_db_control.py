@@ -0,0 +1,122 @@
+import os
+import sqlite3
+
+
+def add_order(db_manager, order_date, status='closed', client_id=1, features=("bore",)):
+    conn = db_manager.connections['Orders.db']
+    cursor = conn.execute("INSERT INTO orders (client_id, client_name, order_date, status) VALUES (?, 'Acme', ?, ?)",
+                          (client_id, order_date, status))
+    order_id = cursor.lastrowid
+    for feature in features:
+        conn.execute("INSERT INTO measurements (order_id, feature, nominal, measured) VALUES (?, ?, 1.0, 1.0)",
+                     (order_id, feature))
+    conn.commit()
+    return order_id
+
+
+def archive_rows(db_manager, file_name, query):
+    conn = sqlite3.connect(os.path.join(db_manager.archive_folder, file_name))
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+
+def test_archive_moves_orders_in_batches(db_manager):
+    order_ids = [add_order(db_manager, f"2022-0{month}-01") for month in range(1, 6)]
+    add_order(db_manager, "2023-06-01", status='open')
+    progress = []
+
+    moved = db_manager.archive_closed_orders(batch_size=2, progress_callback=progress.append)
+
+    assert moved == 5
+    assert progress == [2, 4, 5]
+    assert archive_rows(db_manager, "Orders_2022.db", "SELECT id FROM orders ORDER BY id") == \
+        [(order_id,) for order_id in order_ids]
+    assert db_manager.fetch_data('Orders.db', "SELECT status FROM orders") == [('open',)]
+
+
+def test_archive_moves_measurements_with_their_orders(db_manager):
+    first = add_order(db_manager, "2022-03-01", features=("bore", "slot"))
+    second = add_order(db_manager, "2023-03-01", features=("face",))
+    add_order(db_manager, "2024-01-01", status='open')
+
+    assert db_manager.archive_closed_orders() == 2
+
+    assert archive_rows(db_manager, "Orders_2022.db", "SELECT order_id, feature FROM measurements ORDER BY feature") == \
+        [(first, "bore"), (first, "slot")]
+    assert archive_rows(db_manager, "Orders_2023.db", "SELECT order_id, feature FROM measurements") == [(second, "face")]
+    assert db_manager.fetch_data('Orders.db', "SELECT order_id FROM measurements WHERE order_id IN (?, ?)",
+                                 (first, second)) == []
+
+
+def test_archive_tolerates_reused_measurement_ids(db_manager):
+    add_order(db_manager, "2022-03-01")
+    add_order(db_manager, "2024-01-01", status='open')
+    db_manager.archive_closed_orders()
+
+    # The archived measurement's id is free again in the hot file.
+    db_manager.connections['Orders.db'].execute("DELETE FROM measurements")
+    db_manager.connections['Orders.db'].commit()
+    add_order(db_manager, "2022-04-01")
+    add_order(db_manager, "2024-02-01", status='open')
+
+    assert db_manager.archive_closed_orders() == 1
+    assert len(archive_rows(db_manager, "Orders_2022.db", "SELECT id FROM measurements")) == 2
+
+
+def test_archive_keeps_the_newest_order(db_manager):
+    older = add_order(db_manager, "2022-01-01")
+    newest = add_order(db_manager, "2022-02-01")
+
+    assert db_manager.archive_closed_orders() == 1
+
+    assert db_manager.fetch_data('Orders.db', "SELECT id FROM orders") == [(newest,)]
+    assert archive_rows(db_manager, "Orders_2022.db", "SELECT id FROM orders") == [(older,)]
+
+
+def test_fetch_orders_reads_only_partitions_in_range(db_manager):
+    in_2021 = add_order(db_manager, "2021-05-01")
+    in_2022 = add_order(db_manager, "2022-05-01")
+    hot = add_order(db_manager, f"{db_manager.current_partition_start()[:4]}-01-01", status='open')
+    db_manager.archive_closed_orders()
+
+    def ids(**kwargs):
+        return sorted(row[0] for row in db_manager.fetch_orders("id", **kwargs))
+
+    assert ids() == [hot]
+    assert ids(date_from="2022-01-01") == [in_2022, hot]
+    assert ids(date_from="2021-01-01", date_to="2022-01-01") == [in_2021]
+    assert ids(date_from="2000-01-01", where="status = ?", params=('closed',)) == [in_2021, in_2022]
+
+
+def add_client(db_manager, client_id, name):
+    db_manager.add_new_entry('Clients.db', 'clients', {'client_id': client_id, 'client_name': name})
+
+
+def test_merge_repoints_hot_and_archived_orders(db_manager):
+    add_client(db_manager, 1, "Acme")
+    add_client(db_manager, 2, "Acme Corp")
+    archived = add_order(db_manager, "2022-03-01", client_id=2)
+    hot = add_order(db_manager, "2024-01-01", status='open', client_id=2)
+    db_manager.archive_closed_orders()
+
+    assert db_manager.merge_clients(1, [2])
+
+    assert db_manager.fetch_data('Orders.db', "SELECT id, client_id FROM orders") == [(hot, 1)]
+    assert archive_rows(db_manager, "Orders_2022.db", "SELECT id, client_id FROM orders") == [(archived, 1)]
+    assert db_manager.fetch_data('Clients.db', "SELECT client_id FROM clients") == [(1,)]
+
+
+def test_merge_changes_nothing_when_an_archive_fails(db_manager):
+    add_client(db_manager, 1, "Acme")
+    add_client(db_manager, 2, "Acme Corp")
+    hot = add_order(db_manager, "2024-01-01", status='open', client_id=2)
+    os.makedirs(db_manager.archive_folder)
+    with open(os.path.join(db_manager.archive_folder, "Orders_2022.db"), 'wb') as archive_file:
+        archive_file.write(b"not a database" * 100)
+
+    assert not db_manager.merge_clients(1, [2])
+
+    assert db_manager.fetch_data('Orders.db', "SELECT id, client_id FROM orders") == [(hot, 2)]
+    assert db_manager.fetch_data('Clients.db', "SELECT client_id FROM clients ORDER BY client_id") == [(1,), (2,)]
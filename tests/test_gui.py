@@ -0,0 +1,91 @@
+import pytest
+from PyQt5.QtWidgets import QMessageBox
+
+from gui import DuplicateClientsDialog
+
+
+def add_client(db_manager, client_id, name, phone=""):
+    db_manager.add_new_entry('Clients.db', 'clients', {
+        'client_id': client_id, 'client_name': name, 'client_address1': "", 'client_address2': "",
+        'client_phone': phone, 'client_emailfax': ""})
+
+
+def test_merging_a_pair_refreshes_the_remaining_candidates(qapp, db_manager, monkeypatch):
+    add_client(db_manager, 1, "Precision Gear Co", "555-123-4567")
+    add_client(db_manager, 2, "Precision Gear Inc", "555-123-4567")
+    add_client(db_manager, 3, "Precision Gears", "555-123-4567")
+    monkeypatch.setattr(QMessageBox, 'question', lambda *args: QMessageBox.Yes)
+
+    dialog = DuplicateClientsDialog(db_manager)
+    dialog.dedup_thread.wait()
+    qapp.processEvents()
+    assert len(dialog.candidates) == 3
+
+    pair = next(row for row, (_, a, b) in enumerate(dialog.candidates) if {a[0], b[0]} == {1, 2})
+    keep = dialog.candidates[pair][1][0]
+    merged = 2 if keep == 1 else 1
+    dialog.candidate_table.selectRow(pair)
+    dialog.merge_selected(keep_first=True)
+
+    assert [{a[0], b[0]} for _, a, b in dialog.candidates] == [{keep, 3}]
+    assert dialog.candidate_table.rowCount() == 1
+    assert db_manager.fetch_data('Clients.db', "SELECT client_id FROM clients WHERE client_id = ?", (merged,)) == []
+
+
+def test_archive_button_is_disabled_in_replication_mode(qapp, db_manager):
+    from temp_settings_gui import SettingsWindow
+    assert SettingsWindow(db_manager).archive_button.isEnabled()
+
+    db_manager.replication = {'central': "", 'station': "A", 'interval_s': 60}
+    assert not SettingsWindow(db_manager).archive_button.isEnabled()
+
+
+@pytest.fixture
+def client_window(qapp, db_manager, monkeypatch):
+    from gui import ClientWindow
+    errors = []
+    monkeypatch.setattr(QMessageBox, 'critical', lambda parent, title, text: errors.append(text))
+    add_client(db_manager, 1, "Acme")
+    add_client(db_manager, 2, "Acme Corp")
+    window = ClientWindow(db_manager)
+    window.errors = errors
+    yield window
+    window.flush_edits()
+
+
+def edit_client(window, client_id, name):
+    window.client_id_entry.setText(str(client_id))
+    values = window.fetch_client_values(client_id)
+    for field, entry in (('client_name', window.client_name_entry),
+                         ('client_address1', window.client_address1_entry),
+                         ('client_address2', window.client_address2_entry),
+                         ('client_phone', window.client_phone_entry),
+                         ('client_emailfax', window.client_emailfax_entry)):
+        entry.setText(values[field] or "")
+    window.client_name_entry.setText(name)
+    window.amend_client()
+
+
+def client_ids(db_manager):
+    return [row[0] for row in db_manager.fetch_data('Clients.db', "SELECT client_id FROM clients ORDER BY client_id")]
+
+
+def test_undo_does_not_bring_back_a_merged_client(client_window, db_manager):
+    edit_client(client_window, 2, "Acme Corporation")
+    client_window.flush_edits()
+    assert client_window.undo_stack.count() == 1
+
+    assert db_manager.merge_clients(1, [2])
+    client_window.undo_stack.undo()
+
+    assert client_ids(db_manager) == [1]
+    assert client_window.undo_stack.count() == 0
+    assert len(client_window.errors) == 1
+
+
+def test_failed_edit_is_not_kept_on_the_undo_stack(client_window, db_manager, monkeypatch):
+    monkeypatch.setattr(db_manager, 'apply_row', lambda *args: False)
+    edit_client(client_window, 2, "Acme Corporation")
+
+    assert client_window.undo_stack.count() == 0
+    assert len(client_window.errors) == 1
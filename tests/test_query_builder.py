@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from query_builder import QueryBuilder
+
+
+@pytest.fixture
+def builder():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("""CREATE TABLE clients (id INTEGER PRIMARY KEY, client_id INTEGER, client_name TEXT,
+                    client_address1 TEXT, client_phone TEXT)""")
+    return QueryBuilder(conn)
+
+
+@pytest.mark.parametrize('table_name', ["clients; DROP TABLE clients", "clients--", "1clients"])
+def test_invalid_table_names_are_rejected(builder, table_name):
+    with pytest.raises(ValueError, match="Invalid table name"):
+        builder.insert(table_name, {'client_name': 'Acme'})
+
+
+def test_unknown_table_is_rejected(builder):
+    with pytest.raises(ValueError, match="Unknown table"):
+        builder.select('orders', 'id', 1)
+
+
+def test_unknown_columns_are_rejected(builder):
+    with pytest.raises(ValueError, match="client_name = 'x'"):
+        builder.update('clients', 'client_id', {'client_id': 1, "client_name = 'x'": 'Acme'})
+    with pytest.raises(ValueError, match="Unknown column"):
+        builder.exists('clients', 'missing_key', 1)
+
+
+def test_same_column_set_reuses_sql_in_schema_order(builder):
+    first, first_params = builder.insert('clients', {'client_phone': '555', 'client_name': 'Acme'})
+    second, second_params = builder.insert('clients', {'client_name': 'Globex', 'client_phone': '556'})
+
+    assert first is second
+    assert first == "INSERT INTO clients (client_name, client_phone) VALUES (?, ?)"
+    assert first_params == ['Acme', '555']
+    assert second_params == ['Globex', '556']
+
+
+def test_update_puts_key_last(builder):
+    query, params = builder.update('clients', 'client_id', {'client_phone': '555', 'client_id': 7, 'client_name': 'Acme'})
+
+    assert query == "UPDATE clients SET client_name = ?, client_phone = ? WHERE client_id = ?"
+    assert params == ['Acme', '555', 7]
+    builder.conn.execute("INSERT INTO clients (client_id) VALUES (7)")
+    builder.conn.execute(query, params)
+    assert builder.conn.execute(*builder.select_client(7, ['client_phone', 'client_name'])).fetchall() == [('Acme', '555')]
@@ -0,0 +1,195 @@
+import os
+import sqlite3
+
+import pytest
+
+import replication
+from replication import SyncEngine, install_tracking
+
+
+ORDERS_SCHEMA = [
+    '''CREATE TABLE orders
+       (id INTEGER PRIMARY KEY, client_id INTEGER, client_name TEXT,
+        client_address1 TEXT, client_address2 TEXT,
+        client_phone TEXT, client_emailfax TEXT,
+        order_date TEXT, status TEXT DEFAULT 'open', uid TEXT)''',
+    '''CREATE TABLE measurements
+       (id INTEGER PRIMARY KEY, order_id INTEGER, feature TEXT,
+        nominal REAL, tolerance_plus REAL, tolerance_minus REAL,
+        measured REAL, uid TEXT)''',
+]
+
+
+def make_station(tmp_path, station):
+    folder = tmp_path / station
+    folder.mkdir()
+    conn = sqlite3.connect(folder / 'Orders.db')
+    for statement in ORDERS_SCHEMA:
+        conn.execute(statement)
+    install_tracking(conn, 'Orders.db', station)
+    engine = SyncEngine(str(folder), str(tmp_path / 'central'), station, ['Orders.db'])
+    return conn, engine
+
+
+def add_order(conn, client_name, feature):
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO orders (client_name, order_date) VALUES (?, '2024-01-01')", (client_name,))
+    order_id = cursor.lastrowid
+    cursor.execute("INSERT INTO measurements (order_id, feature) VALUES (?, ?)", (order_id, feature))
+    conn.commit()
+    return order_id
+
+
+def orders_with_features(conn):
+    return sorted(conn.execute("""
+        SELECT orders.client_name, measurements.feature FROM orders
+        LEFT JOIN measurements ON measurements.order_id = orders.id
+    """).fetchall())
+
+
+def test_orders_with_same_local_id_survive_on_both_stations(tmp_path):
+    os.mkdir(tmp_path / 'central')
+    conn_a, engine_a = make_station(tmp_path, 'A')
+    conn_b, engine_b = make_station(tmp_path, 'B')
+
+    assert add_order(conn_a, 'Acme', 'bore') == 1
+    assert add_order(conn_b, 'Globex', 'slot') == 1
+    # Closing the order moves its version after its measurement's.
+    conn_a.execute("UPDATE orders SET status = 'closed' WHERE id = 1")
+    conn_a.commit()
+
+    engine_a.sync()
+    engine_b.sync()
+    engine_a.sync()
+
+    expected = [('Acme', 'bore'), ('Globex', 'slot')]
+    assert orders_with_features(conn_a) == expected
+    assert orders_with_features(conn_b) == expected
+    central = sqlite3.connect(tmp_path / 'central' / 'Orders.db')
+    assert orders_with_features(central) == expected
+    assert conn_b.execute("SELECT status FROM orders WHERE client_name = 'Acme'").fetchone() == ('closed',)
+
+
+def add_order_log(conn):
+    conn.execute("CREATE TABLE order_log (order_uid TEXT, operation TEXT)")
+    for operation in ('INSERT', 'UPDATE', 'DELETE'):
+        row = 'OLD' if operation == 'DELETE' else 'NEW'
+        # Filling in the uid of a new row is part of the insert.
+        when = "WHEN OLD.uid IS NOT NULL" if operation == 'UPDATE' else ""
+        conn.execute(f"""CREATE TRIGGER order_log_{operation.lower()} AFTER {operation} ON orders {when}
+                         BEGIN INSERT INTO order_log VALUES ({row}.uid, '{operation}'); END""")
+    conn.commit()
+
+
+def test_remote_update_is_applied_in_place(tmp_path):
+    os.mkdir(tmp_path / 'central')
+    conn_a, engine_a = make_station(tmp_path, 'A')
+    conn_b, engine_b = make_station(tmp_path, 'B')
+    add_order(conn_a, 'Acme', 'bore')
+    engine_a.sync()
+    engine_b.sync()
+    add_order_log(conn_b)
+    local_id = conn_b.execute("SELECT id FROM orders").fetchone()[0]
+
+    conn_a.execute("UPDATE orders SET status = 'closed'")
+    conn_a.commit()
+    engine_a.sync()
+    engine_b.sync()
+
+    assert conn_b.execute("SELECT id, status FROM orders").fetchall() == [(local_id, 'closed')]
+    assert [row[0] for row in conn_b.execute("SELECT operation FROM order_log")] == ['UPDATE']
+
+
+def test_bootstrapped_station_receives_history(tmp_path):
+    os.mkdir(tmp_path / 'central')
+    conn_a, engine_a = make_station(tmp_path, 'A')
+    add_order_log(conn_a)
+    add_order(conn_a, 'Acme', 'bore')
+    engine_a.sync()
+
+    os.mkdir(tmp_path / 'C')
+    engine_c = SyncEngine(str(tmp_path / 'C'), str(tmp_path / 'central'), 'C', ['Orders.db'])
+    engine_c.bootstrap()
+    conn_c = sqlite3.connect(tmp_path / 'C' / 'Orders.db')
+    install_tracking(conn_c, 'Orders.db', 'C')
+
+    assert orders_with_features(conn_c) == [('Acme', 'bore')]
+    assert [row[0] for row in conn_c.execute("SELECT operation FROM order_log")] == ['INSERT']
+    central = sqlite3.connect(tmp_path / 'central' / 'Orders.db')
+    assert central.execute("SELECT name FROM sqlite_master WHERE name LIKE 'sync!_%!_insert' ESCAPE '!'").fetchall() == []
+
+
+class WatchedConnection:
+    """Source connection failing any read made while the target is locked."""
+    def __init__(self, conn, target):
+        self.conn = conn
+        self.target = target
+
+    def execute(self, *args):
+        assert not self.target.in_transaction
+        return self.conn.execute(*args)
+
+
+def test_source_rows_are_read_before_locking_target(tmp_path):
+    os.mkdir(tmp_path / 'central')
+    conn_a, engine_a = make_station(tmp_path, 'A')
+    conn_b, engine_b = make_station(tmp_path, 'B')
+    add_order(conn_a, 'Acme', 'bore')
+    add_order(conn_a, 'Globex', 'slot')
+    changes = conn_a.execute("SELECT tbl, pk, seq, changed_at, station, deleted FROM sync_rows ORDER BY seq").fetchall()
+
+    conn_b.isolation_level = None
+    prepared = engine_b.read_changes(WatchedConnection(conn_a, conn_b), 'Orders.db', changes)
+    applied = engine_b.apply_changes(conn_b, 'Orders.db', prepared, True)
+    conn_b.execute("COMMIT")
+
+    assert applied == 4
+    assert orders_with_features(conn_b) == [('Acme', 'bore'), ('Globex', 'slot')]
+
+
+def test_locked_replica_is_not_reported_as_central_unavailable(tmp_path, monkeypatch):
+    monkeypatch.setattr(replication, 'CENTRAL_TIMEOUT', 0.1)
+    os.mkdir(tmp_path / 'central')
+    conn_a, engine_a = make_station(tmp_path, 'A')
+    conn_b, engine_b = make_station(tmp_path, 'B')
+    add_order(conn_a, 'Acme', 'bore')
+    engine_a.sync()
+
+    conn_b.execute("BEGIN IMMEDIATE")
+    with pytest.raises(sqlite3.OperationalError):
+        engine_b.sync()
+    conn_b.rollback()
+
+    assert engine_b.sync() == {'Orders.db': (0, 2)}
+
+
+def test_shared_folder_moved_to_replication_keeps_one_copy_of_each_order(tmp_path):
+    # A pre-replication shared folder: no uid columns, no sync tables.
+    os.mkdir(tmp_path / 'central')
+    shared = sqlite3.connect(tmp_path / 'central' / 'Orders.db')
+    shared.execute("""CREATE TABLE orders (id INTEGER PRIMARY KEY, client_id INTEGER, client_name TEXT,
+                      client_address1 TEXT, client_address2 TEXT, client_phone TEXT, client_emailfax TEXT,
+                      order_date TEXT, status TEXT DEFAULT 'open')""")
+    shared.execute("""CREATE TABLE measurements (id INTEGER PRIMARY KEY, order_id INTEGER, feature TEXT,
+                      nominal REAL, tolerance_plus REAL, tolerance_minus REAL, measured REAL)""")
+    add_order(shared, 'Acme', 'bore')
+    add_order(shared, 'Globex', 'slot')
+    shared.close()
+
+    stations = []
+    for station in ('A', 'B'):
+        os.mkdir(tmp_path / station)
+        engine = SyncEngine(str(tmp_path / station), str(tmp_path / 'central'), station, ['Orders.db'])
+        engine.bootstrap()
+        conn = sqlite3.connect(tmp_path / station / 'Orders.db')
+        install_tracking(conn, 'Orders.db', station)
+        engine.sync()
+        stations.append((conn, engine))
+    for conn, engine in stations:
+        engine.sync()
+
+    expected = [('Acme', 'bore'), ('Globex', 'slot')]
+    central = sqlite3.connect(tmp_path / 'central' / 'Orders.db')
+    assert orders_with_features(central) == expected
+    for conn, _ in stations:
+        assert orders_with_features(conn) == expected
@@ -0,0 +1,66 @@
+import os
+
+from report_engine import ReportEngine, is_in_tolerance
+
+
+def test_reading_on_upper_limit_passes():
+    assert is_in_tolerance(10.2, 0.1, 0.1, 10.3)
+    assert is_in_tolerance(0.7, 0.1, 0.1, 0.8)
+
+
+def test_reading_on_lower_limit_passes():
+    assert is_in_tolerance(10.2, 0.1, 0.1, 10.1)
+    assert is_in_tolerance(0.7, 0.1, 0.1, 0.6)
+
+
+def test_reading_just_outside_limits_fails():
+    assert not is_in_tolerance(10.2, 0.1, 0.1, 10.3001)
+    assert not is_in_tolerance(10.2, 0.1, 0.1, 10.0999)
+    assert not is_in_tolerance(0.7, 0.1, 0.1, 0.8001)
+
+
+def test_tolerance_signs_and_missing_values():
+    assert is_in_tolerance(5.0, 0.05, -0.05, 4.95)
+    assert is_in_tolerance(5.0, None, None, 5.0)
+    assert not is_in_tolerance(5.0, None, None, 5.01)
+    assert not is_in_tolerance(None, 0.1, 0.1, 5.0)
+    assert not is_in_tolerance(5.0, 0.1, 0.1, None)
+
+
+def test_archived_orders_get_reports(db_manager, tmp_path):
+    conn = db_manager.connections['Orders.db']
+    for order_date, status, feature in (("2022-03-01", 'closed', 'bore'), ("2024-01-01", 'open', 'slot')):
+        order_id = conn.execute("INSERT INTO orders (client_id, order_date, status) VALUES (1, ?, ?)",
+                                (order_date, status)).lastrowid
+        conn.execute("INSERT INTO measurements (order_id, feature) VALUES (?, ?)", (order_id, feature))
+    conn.commit()
+    assert db_manager.archive_closed_orders() == 1
+    archive_paths = [os.path.join(db_manager.archive_folder, file_name)
+                     for file_name, _, _ in db_manager.list_archive_partitions()]
+
+    results = ReportEngine(db_manager.db_folder, max_workers=1, archive_paths=archive_paths).run(
+        str(tmp_path / "Reports"))
+
+    assert sorted((order_id, error) for order_id, _, _, error in results) == [(1, None), (2, None)]
+    with open(tmp_path / "Reports" / "CoC_1.html", encoding='utf-8') as report_file:
+        assert "bore" in report_file.read()
+
+
+def test_failing_chunk_does_not_discard_other_reports(db_manager, tmp_path):
+    conn = db_manager.connections['Orders.db']
+    # Different clients land in different chunks; the text reading cannot be compared as a decimal.
+    for client_id, measured in ((1, 'n/a'), (2, 5.0)):
+        order_id = conn.execute("INSERT INTO orders (client_id, order_date) VALUES (?, '2024-01-01')",
+                                (client_id,)).lastrowid
+        conn.execute("INSERT INTO measurements (order_id, feature, nominal, measured) VALUES (?, 'bore', 5.0, ?)",
+                     (order_id, measured))
+    conn.commit()
+    progress = []
+
+    results = ReportEngine(db_manager.db_folder, max_workers=1).run(
+        str(tmp_path / "Reports"), progress_callback=lambda done, total, result: progress.append((done, total)))
+
+    results = {order_id: (path, error) for order_id, path, _, error in results}
+    assert results[1][0] is None and results[1][1]
+    assert results[2] == (os.path.join(str(tmp_path / "Reports"), "CoC_2.html"), None)
+    assert progress == [(1, 2), (2, 2)]